@@ -4,6 +4,7 @@ TrustStack Social Media Automation - Main CLI
 """
 import os
 import sys
+import asyncio
 import click
 import logging
 from pathlib import Path
@@ -12,14 +13,10 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from src.config import get_config
-from src.utils import setup_logging, save_json, load_json
-from src.notion_client import NotionClient
-from src.openrouter_client import OpenrouterClient
-from src.post_generator import PostGenerator
-from src.mastodon_client import MastodonClient
-from src.article_fetcher import ArticleFetcher
-from src.comment_generator import CommentGenerator
-from src.reply_generator import ReplyGenerator
+from src.utils import setup_logging, save_json, save_json_stream, load_json
+
+# API clients and generators are imported inside the commands that use them,
+# so each command only pays for the third-party libraries it needs
 
 # Setup logging
 setup_logging()
@@ -50,6 +47,44 @@ def cli(ctx):
         sys.exit(1)
 
 
+def _get_notion_client(ctx):
+    """Return the Notion client shared by all commands in this invocation"""
+    client = ctx.obj.get('notion_client')
+    if client is None:
+        from src.notion_client import NotionClient
+        config = ctx.obj['config']
+        client = NotionClient(config.notion_api_key, config.notion_page_id)
+        ctx.obj['notion_client'] = client
+    return client
+
+
+def _get_openrouter_client(ctx):
+    """Return the Openrouter client shared by all commands in this invocation"""
+    client = ctx.obj.get('openrouter_client')
+    if client is None:
+        from src.openrouter_client import OpenrouterClient
+        config = ctx.obj['config']
+        client = OpenrouterClient(config.openrouter_api_key, config.openrouter_model)
+        ctx.obj['openrouter_client'] = client
+        # Connections stay open across commands and are closed on exit
+        ctx.find_root().call_on_close(client.close)
+    return client
+
+
+def _get_mastodon_client(ctx):
+    """Return the Mastodon client shared by all commands in this invocation"""
+    client = ctx.obj.get('mastodon_client')
+    if client is None:
+        from src.mastodon_client import MastodonClient
+        config = ctx.obj['config']
+        client = MastodonClient(
+            config.mastodon_access_token,
+            config.mastodon_api_base_url
+        )
+        ctx.obj['mastodon_client'] = client
+    return client
+
+
 @cli.command()
 @click.option('--count', '-c', default=5, help='Number of posts to generate')
 @click.option('--output', '-o', default='output/posts.json', help='Output file path')
@@ -57,13 +92,15 @@ def cli(ctx):
 @click.pass_context
 def generate_posts(ctx, count, output, temperature):
     """Generate social media posts from Notion content"""
+    from src.post_generator import PostGenerator
+    
     click.echo(f"Generating {count} social media posts...")
     
     config = ctx.obj['config']
     
     # Initialize clients
-    notion_client = NotionClient(config.notion_api_key, config.notion_page_id)
-    openrouter_client = OpenrouterClient(config.openrouter_api_key, config.openrouter_model)
+    notion_client = _get_notion_client(ctx)
+    openrouter_client = _get_openrouter_client(ctx)
     
     # Initialize post generator
     max_length = config.post_settings.get('max_length', 500)
@@ -93,8 +130,6 @@ def generate_posts(ctx, count, output, temperature):
 @click.pass_context
 def post_to_mastodon(ctx, file, index, post_all, preview):
     """Post generated content to Mastodon"""
-    config = ctx.obj['config']
-    
     # Load posts
     try:
         posts = load_json(file)
@@ -103,10 +138,7 @@ def post_to_mastodon(ctx, file, index, post_all, preview):
         sys.exit(1)
     
     # Initialize Mastodon client
-    mastodon_client = MastodonClient(
-        config.mastodon_access_token,
-        config.mastodon_api_base_url
-    )
+    mastodon_client = _get_mastodon_client(ctx)
     
     # Determine which posts to post
     if index is not None:
@@ -130,27 +162,31 @@ def post_to_mastodon(ctx, file, index, post_all, preview):
         posts_to_post = [posts[index]]
     
     # Post to Mastodon
-    for i, post in enumerate(posts_to_post):
-        content = post['content']
-        
-        if preview:
+    if preview:
+        for post in posts_to_post:
+            content = post['content']
             click.echo(f"\n--- Preview Post ---")
             click.echo(content)
             click.echo(f"Length: {len(content)} chars")
-        else:
-            click.echo(f"\nPosting to Mastodon...")
-            try:
-                result = mastodon_client.post(content)
-                click.echo(f"✓ Posted successfully!")
-                click.echo(f"  URL: {result['url']}")
-                
-                # Update post status
-                post['posted'] = True
-                post['posted_at'] = result['created_at']
-                post['mastodon_url'] = result['url']
-                
-            except Exception as e:
-                click.echo(f"✗ Error posting: {e}", err=True)
+    else:
+        # Posts are independent, so they can go out concurrently
+        click.echo(f"\nPosting {len(posts_to_post)} post(s) to Mastodon...")
+        results = asyncio.run(
+            mastodon_client.apost_many([post['content'] for post in posts_to_post])
+        )
+        
+        for post, result in zip(posts_to_post, results):
+            if isinstance(result, Exception):
+                click.echo(f"✗ Error posting: {result}", err=True)
+                continue
+            
+            click.echo(f"✓ Posted successfully!")
+            click.echo(f"  URL: {result['url']}")
+            
+            # Update post status
+            post['posted'] = True
+            post['posted_at'] = result['created_at']
+            post['mastodon_url'] = result['url']
     
     # Save updated posts
     if not preview:
@@ -166,6 +202,8 @@ def post_to_mastodon(ctx, file, index, post_all, preview):
 @click.pass_context
 def fetch_articles(ctx, count, output, min_age_hours, max_age_days):
     """Fetch top articles from tech blogs"""
+    from src.article_fetcher import ArticleFetcher
+    
     click.echo(f"Fetching top {count} AI/ML articles...")
     
     config = ctx.obj['config']
@@ -185,7 +223,7 @@ def fetch_articles(ctx, count, output, min_age_hours, max_age_days):
     )
     
     # Save to file
-    save_json(articles, output)
+    save_json_stream(articles, output)
     
     click.echo(f"\n✓ Fetched {len(articles)} articles")
     click.echo(f"✓ Saved to {output}")
@@ -203,9 +241,14 @@ def fetch_articles(ctx, count, output, min_age_hours, max_age_days):
 @click.option('--file', '-f', default='output/articles.json', help='Input file with articles')
 @click.option('--output', '-o', default='output/comments.json', help='Output file path')
 @click.option('--temperature', '-t', default=0.7, help='Sampling temperature')
+@click.option('--batch-size', '-b', default=4, help='Articles per LLM request')
+@click.option('--concurrency', type=int, help='Maximum LLM requests in flight at once (default from config)')
+@click.option('--no-cache', is_flag=True, help='Always generate new comments instead of reusing cached ones')
 @click.pass_context
-def generate_comments(ctx, file, output, temperature):
+def generate_comments(ctx, file, output, temperature, batch_size, concurrency, no_cache):
     """Generate comments for articles"""
+    from src.comment_generator import CommentCache, CommentGenerator
+    
     click.echo(f"Generating comments for articles...")
     
     config = ctx.obj['config']
@@ -218,21 +261,31 @@ def generate_comments(ctx, file, output, temperature):
         sys.exit(1)
     
     # Initialize clients
-    notion_client = NotionClient(config.notion_api_key, config.notion_page_id)
-    openrouter_client = OpenrouterClient(config.openrouter_api_key, config.openrouter_model)
+    notion_client = _get_notion_client(ctx)
+    openrouter_client = _get_openrouter_client(ctx)
     
     # Initialize comment generator
-    max_length = config.comment_settings.get('max_length', 300)
-    comment_generator = CommentGenerator(openrouter_client, notion_client, max_length)
+    comment_settings = config.comment_settings
+    comment_generator = CommentGenerator(
+        openrouter_client,
+        notion_client,
+        max_length=comment_settings.get('max_length', 300),
+        max_concurrency=concurrency or comment_settings.get('max_concurrency', 4),
+        rate_limit=comment_settings.get('rate_limit'),
+        comment_cache=None if no_cache else CommentCache(
+            comment_settings.get('cache_path', 'output/.comment_cache.sqlite')
+        )
+    )
     
     # Generate comments
     articles_with_comments = comment_generator.generate_comments(
         articles=articles,
-        temperature=temperature
+        temperature=temperature,
+        batch_size=batch_size
     )
     
     # Save to file
-    save_json(articles_with_comments, output)
+    save_json_stream(articles_with_comments, output)
     
     click.echo(f"\n✓ Generated comments for {len(articles_with_comments)} articles")
     click.echo(f"✓ Saved to {output}")
@@ -253,6 +306,8 @@ def generate_comments(ctx, file, output, temperature):
 @click.pass_context
 def post_comments(ctx, file, index, preview):
     """Post generated comments to Mastodon"""
+    from src.comment_generator import CommentGenerator
+    
     config = ctx.obj['config']
     
     # Load comments
@@ -270,12 +325,9 @@ def post_comments(ctx, file, index, preview):
         sys.exit(1)
     
     # Initialize clients
-    notion_client = NotionClient(config.notion_api_key, config.notion_page_id)
-    openrouter_client = OpenrouterClient(config.openrouter_api_key, config.openrouter_model)
-    mastodon_client = MastodonClient(
-        config.mastodon_access_token,
-        config.mastodon_api_base_url
-    )
+    notion_client = _get_notion_client(ctx)
+    openrouter_client = _get_openrouter_client(ctx)
+    mastodon_client = _get_mastodon_client(ctx)
     
     max_length = config.comment_settings.get('max_length', 300)
     comment_generator = CommentGenerator(openrouter_client, notion_client, max_length)
@@ -321,6 +373,70 @@ def post_comments(ctx, file, index, preview):
                 click.echo(f"✗ Error posting: {e}", err=True)
 
 
+@cli.command()
+@click.option('--count', '-c', default=5, help='Number of top articles to comment on')
+@click.option('--output', '-o', default='output/comments.json', help='Output file path')
+@click.option('--temperature', '-t', default=0.7, help='Sampling temperature')
+@click.option('--concurrency', type=int, help='Maximum LLM requests in flight at once (default from config)')
+@click.option('--post', 'post_comments_flag', is_flag=True, help='Actually post the comments to Mastodon (default: preview only)')
+@click.option('--no-cache', is_flag=True, help='Always generate new comments instead of reusing cached ones')
+@click.pass_context
+def comment_pipeline(ctx, count, output, temperature, concurrency, post_comments_flag, no_cache):
+    """Fetch articles, then comment on and post them as a streaming pipeline"""
+    from src.article_fetcher import ArticleFetcher
+    from src.comment_generator import CommentCache, CommentGenerator
+    
+    config = ctx.obj['config']
+    
+    # Ranking needs every feed, so fetching finishes before the pipeline starts
+    click.echo(f"Fetching top {count} articles...")
+    article_fetcher = ArticleFetcher(
+        rss_feeds=config.rss_feeds,
+        keywords=config.article_keywords,
+        max_articles_per_feed=config.article_settings.get('max_articles_per_feed', 20)
+    )
+    articles = article_fetcher.get_top_articles(count=count)
+    
+    comment_settings = config.comment_settings
+    comment_generator = CommentGenerator(
+        _get_openrouter_client(ctx),
+        _get_notion_client(ctx),
+        max_length=comment_settings.get('max_length', 300),
+        max_concurrency=concurrency or comment_settings.get('max_concurrency', 4),
+        rate_limit=comment_settings.get('rate_limit'),
+        comment_cache=None if no_cache else CommentCache(
+            comment_settings.get('cache_path', 'output/.comment_cache.sqlite')
+        )
+    )
+    
+    mastodon_client = _get_mastodon_client(ctx) if post_comments_flag else None
+    
+    click.echo(f"Commenting on {len(articles)} articles...")
+    articles = comment_generator.run_pipeline(
+        articles,
+        mastodon_client=mastodon_client,
+        temperature=temperature
+    )
+    
+    save_json_stream(articles, output)
+    click.echo(f"\n✓ Saved to {output}")
+    
+    for i, item in enumerate(articles, 1):
+        click.echo(f"\n--- Article {i} ---")
+        click.echo(f"Title: {item['title']}")
+        if not item.get('comment'):
+            click.echo(f"✗ No comment: {item.get('error', 'empty response')}", err=True)
+        elif item.get('post_url'):
+            click.echo(f"✓ Posted: {item['post_url']}")
+        elif item.get('post_error'):
+            click.echo(f"✗ Error posting: {item['post_error']}", err=True)
+        else:
+            click.echo(item['mastodon_post'])
+    
+    if not post_comments_flag:
+        click.echo("\n💡 To actually post these comments, run with --post flag")
+
+
 @cli.command()
 @click.option('--post-count', default=3, help='Number of posts to generate')
 @click.option('--article-count', default=5, help='Number of articles to fetch')
@@ -370,12 +486,7 @@ def full_workflow(ctx, post_count, article_count, post_to_mastodon):
 @click.pass_context
 def account_info(ctx):
     """Display Mastodon account information"""
-    config = ctx.obj['config']
-    
-    mastodon_client = MastodonClient(
-        config.mastodon_access_token,
-        config.mastodon_api_base_url
-    )
+    mastodon_client = _get_mastodon_client(ctx)
     
     info = mastodon_client.get_account_info()
     
@@ -393,10 +504,11 @@ def account_info(ctx):
 @click.option('--count', '-c', default=5, help='Number of posts to find')
 @click.option('--output', '-o', default='output/replies.json', help='Output file path')
 @click.option('--post-replies', is_flag=True, help='Actually post the replies to Mastodon')
+@click.option('--concurrency', default=4, help='Maximum API requests in flight at once')
 @click.pass_context
-def search_and_reply(ctx, keyword, count, output, post_replies):
+def search_and_reply(ctx, keyword, count, output, post_replies, concurrency):
     """Search for relevant posts and generate replies using structured outputs"""
-    config = ctx.obj['config']
+    from src.reply_generator import ReplyGenerator
     
     # Default keywords if not provided
     if not keyword:
@@ -408,10 +520,7 @@ def search_and_reply(ctx, keyword, count, output, post_replies):
     click.echo(f"Looking for {count} recent posts...")
     
     # Initialize clients
-    mastodon_client = MastodonClient(
-        config.mastodon_access_token,
-        config.mastodon_api_base_url
-    )
+    mastodon_client = _get_mastodon_client(ctx)
     
     # Get account info to filter out own posts
     account_info = mastodon_client.get_account_info()
@@ -438,8 +547,8 @@ def search_and_reply(ctx, keyword, count, output, post_replies):
         click.echo(f"   URL: {post['url']}")
     
     # Initialize AI clients
-    notion_client = NotionClient(config.notion_api_key, config.notion_page_id)
-    openrouter_client = OpenrouterClient(config.openrouter_api_key, config.openrouter_model)
+    notion_client = _get_notion_client(ctx)
+    openrouter_client = _get_openrouter_client(ctx)
     
     # Generate replies using structured outputs
     click.echo(f"\n🤖 Generating replies using AI structured outputs...")
@@ -448,7 +557,8 @@ def search_and_reply(ctx, keyword, count, output, post_replies):
     
     posts_with_replies = reply_generator.generate_replies_batch(
         posts=posts,
-        temperature=0.7
+        temperature=0.7,
+        concurrency=concurrency
     )
     
     # Save to file
@@ -479,27 +589,24 @@ def search_and_reply(ctx, keyword, count, output, post_replies):
         click.echo(f"Posting {len(replies_to_post)} replies to Mastodon...")
         click.echo("="*60)
         
-        for i, item in enumerate(replies_to_post, 1):
-            try:
-                click.echo(f"\n[{i}/{len(replies_to_post)}] Replying to @{item['account']['username']}...")
-                
-                result = mastodon_client.reply_to_status(
-                    status_id=item['id'],
-                    reply_content=item['reply'],
-                    visibility='public'
-                )
-                
+        results = asyncio.run(mastodon_client.areply_many(
+            [(item['id'], item['reply']) for item in replies_to_post],
+            max_concurrency=concurrency
+        ))
+        
+        posted = 0
+        for i, (item, result) in enumerate(zip(replies_to_post, results), 1):
+            progress = f"\n[{i}/{len(replies_to_post)}]"
+            username = item['account']['username']
+            if isinstance(result, Exception):
+                click.echo(f"{progress} Failed to reply to @{username}", err=True)
+                click.echo(f"  ✗ Error: {result}", err=True)
+            else:
+                click.echo(f"{progress} Replied to @{username}")
                 click.echo(f"  ✓ Posted: {result['url']}")
-                
-                # Brief pause between replies
-                import time
-                if i < len(replies_to_post):
-                    time.sleep(2)
-                
-            except Exception as e:
-                click.echo(f"  ✗ Error: {e}", err=True)
+                posted += 1
         
-        click.echo(f"\n✓ Posted {len(replies_to_post)} replies!")
+        click.echo(f"\n✓ Posted {posted} replies!")
     
     elif not post_replies:
         click.echo(f"\n💡 To actually post these replies, run with --post-replies flag")
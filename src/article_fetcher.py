@@ -1,17 +1,166 @@
 """
 Article fetcher from RSS feeds and tech blogs
 """
+import asyncio
+import calendar
+import hashlib
+import heapq
 import logging
+import time
+import xml.etree.ElementTree as ET
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+import aiohttp
 import feedparser
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
-from urllib.parse import urlparse
+import requests
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from io import BytesIO
 
-from .utils import extract_keywords, clean_text
+from .utils import build_keyword_matcher, clean_text, match_keywords, save_json, load_json
 
 logger = logging.getLogger(__name__)
 
 
+def _event_loop_running() -> bool:
+    """Check whether the current thread is already running an event loop"""
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+def _parse_feed_date(value: Optional[str]) -> Optional[List[int]]:
+    """Parse an RFC 822 or ISO 8601 feed date into a UTC time tuple"""
+    if not value:
+        return None
+    
+    value = value.strip()
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return list(dt.utctimetuple())
+
+
+def _parse_feed_xml(body: bytes, limit: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Extract entries from well-formed RSS/Atom bytes with a streaming parser
+    
+    Args:
+        body: Raw feed document
+        limit: Maximum number of entries to extract
+        
+    Returns:
+        Entries in the same shape as ArticleFetcher._extract_entries, or None
+        if the document could not be handled and feedparser should be used
+    """
+    entries = []
+    
+    try:
+        for _, elem in ET.iterparse(BytesIO(body), events=('end',)):
+            if elem.tag.rsplit('}', 1)[-1] not in ('item', 'entry'):
+                continue
+            
+            link = ''
+            for link_elem in elem.iterfind('{*}link'):
+                if link_elem.text and link_elem.text.strip():
+                    link = link_elem.text
+                    break
+                if link_elem.get('href') and link_elem.get('rel', 'alternate') == 'alternate':
+                    link = link_elem.get('href')
+                    break
+            
+            summary_elem = None
+            for tag in ('{*}description', '{*}summary', '{*}content'):
+                summary_elem = elem.find(tag)
+                if summary_elem is not None:
+                    break
+            
+            published = None
+            for tag in ('{*}pubDate', '{*}published', '{*}date', '{*}issued'):
+                published = elem.findtext(tag)
+                if published:
+                    break
+            
+            entries.append({
+                'title': elem.findtext('{*}title', ''),
+                'link': link,
+                'summary': ''.join(summary_elem.itertext()) if summary_elem is not None else '',
+                'published_parsed': _parse_feed_date(published)
+            })
+            
+            # Release the parsed subtree right away
+            elem.clear()
+            if len(entries) >= limit:
+                break
+    except ET.ParseError:
+        return None
+    
+    return entries or None
+
+
+@lru_cache(maxsize=4096)
+def _canonical_url(url: str) -> str:
+    """Normalize an article URL so cross-posted copies compare equal"""
+    return url.split('#', 1)[0].rstrip('/')
+
+
+@dataclass
+class Article:
+    """A feed article with its keyword matches"""
+    
+    # Declared by hand rather than with slots=True, which needs Python 3.10
+    __slots__ = (
+        'title', 'url', 'summary', 'source',
+        'published_ts', 'matched_keywords', 'relevance_score'
+    )
+    
+    title: str
+    url: str
+    summary: str
+    source: str
+    published_ts: Optional[int]
+    matched_keywords: List[str]
+    relevance_score: int
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the dictionary shape saved to JSON and used by the generators"""
+        return {
+            'title': self.title,
+            'url': self.url,
+            'summary': self.summary,
+            'source': self.source,
+            'published_ts': self.published_ts,
+            'matched_keywords': self.matched_keywords,
+            'relevance_score': self.relevance_score,
+            'published_date': (
+                datetime.fromtimestamp(self.published_ts, tz=timezone.utc).isoformat()
+                if self.published_ts is not None else None
+            )
+        }
+
+
+def _conditional_headers(cached: Dict[str, Any]) -> Dict[str, str]:
+    """Build conditional GET headers so the server can answer 304 when nothing changed"""
+    headers = {}
+    if cached.get('etag'):
+        headers['If-None-Match'] = cached['etag']
+    if cached.get('modified'):
+        headers['If-Modified-Since'] = cached['modified']
+    return headers
+
+
 class ArticleFetcher:
     """Fetch and filter articles from RSS feeds"""
     
@@ -19,7 +168,10 @@ class ArticleFetcher:
         self,
         rss_feeds: List[Dict[str, str]],
         keywords: List[str],
-        max_articles_per_feed: int = 20
+        max_articles_per_feed: int = 20,
+        max_concurrency: int = 16,
+        timeout_seconds: int = 15,
+        cache_path: Optional[str] = "output/.feed_cache.json"
     ):
         """
         Initialize article fetcher
@@ -28,17 +180,28 @@ class ArticleFetcher:
             rss_feeds: List of RSS feed configurations
             keywords: Keywords for filtering articles
             max_articles_per_feed: Maximum articles to fetch per feed
+            max_concurrency: Maximum number of feeds downloaded at once
+            timeout_seconds: Total timeout for a single feed download
+            cache_path: File used to persist feed ETags/Last-Modified between runs (None disables)
         """
         self.rss_feeds = rss_feeds
         self.keywords = keywords
         self.max_articles_per_feed = max_articles_per_feed
+        self.max_concurrency = max_concurrency
+        self.timeout_seconds = timeout_seconds
+        self.cache_path = cache_path
+        self._feed_cache = self._load_feed_cache()
+        
+        # Build the keyword automaton once so each entry is scanned in a single pass
+        self._matcher = build_keyword_matcher(keywords)
+        
         logger.info(f"Initialized ArticleFetcher with {len(rss_feeds)} feeds")
     
     def fetch_articles(
         self,
         min_age_hours: int = 1,
         max_age_days: int = 7
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Article]:
         """
         Fetch articles from all RSS feeds
         
@@ -52,50 +215,227 @@ class ArticleFetcher:
         logger.info(f"Fetching articles from {len(self.rss_feeds)} feeds")
         
         all_articles = []
-        now = datetime.now()
-        min_date = now - timedelta(days=max_age_days)
-        max_date = now - timedelta(hours=min_age_hours)
+        per_feed = Counter()
+        # Compare plain UTC epoch seconds rather than datetime objects
+        now_ts = int(time.time())
+        min_ts = now_ts - max_age_days * 86400
+        max_ts = now_ts - min_age_hours * 3600
         
+        feeds = []
         for feed_config in self.rss_feeds:
+            if not feed_config.get('url'):
+                logger.warning(f"No URL for feed: {feed_config.get('name', 'Unknown')}")
+                continue
+            feeds.append(feed_config)
+        
+        # Download all feeds concurrently, then parse entries in feed order.
+        # asyncio.run() cannot be nested, so callers already inside an event
+        # loop get the thread pool instead.
+        if _event_loop_running():
+            results = self._fetch_all_threaded(feeds)
+        else:
+            results = asyncio.run(self._fetch_all_async(feeds))
+        
+        for feed_config, entries in results:
             feed_name = feed_config.get('name', 'Unknown')
-            feed_url = feed_config.get('url')
             
-            if not feed_url:
-                logger.warning(f"No URL for feed: {feed_name}")
+            if entries is None:
                 continue
             
-            logger.info(f"Fetching feed: {feed_name}")
-            
-            try:
-                feed = feedparser.parse(feed_url)
+            for entry in entries:
+                article = self._parse_entry(entry, feed_name)
                 
-                if feed.bozo:
-                    logger.warning(f"Feed parsing error for {feed_name}: {feed.bozo_exception}")
-                
-                for entry in feed.entries[:self.max_articles_per_feed]:
-                    article = self._parse_entry(entry, feed_name)
-                    
-                    if article:
-                        # Check date range
-                        article_date = article.get('published_date')
-                        if article_date:
-                            if min_date <= article_date <= max_date:
-                                all_articles.append(article)
-                        else:
-                            # Include if no date available
+                if article:
+                    # Check date range
+                    published_ts = article.published_ts
+                    if published_ts is not None:
+                        if min_ts <= published_ts <= max_ts:
                             all_articles.append(article)
-                
-                logger.info(f"Fetched {len([a for a in all_articles if a.get('source') == feed_name])} articles from {feed_name}")
-                
-            except Exception as e:
-                logger.error(f"Error fetching feed {feed_name}: {e}")
-                continue
+                            per_feed[feed_name] += 1
+                    else:
+                        # Include if no date available
+                        all_articles.append(article)
+                        per_feed[feed_name] += 1
+            
+            logger.info(f"Fetched {per_feed[feed_name]} articles from {feed_name}")
+        
+        self._save_feed_cache()
+        self._score_articles(all_articles)
         
         logger.info(f"Fetched total of {len(all_articles)} articles")
         return all_articles
     
-    def _parse_entry(self, entry: Any, source: str) -> Optional[Dict[str, Any]]:
-        """Parse RSS entry into article dictionary"""
+    async def _fetch_all_async(
+        self,
+        feeds: List[Dict[str, str]]
+    ) -> List[Tuple[Dict[str, str], Optional[List[Dict[str, Any]]]]]:
+        """Download and parse all feeds concurrently"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout_seconds)
+        
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            entries = await asyncio.gather(
+                *[self._fetch_one(session, semaphore, feed_config) for feed_config in feeds]
+            )
+        
+        return list(zip(feeds, entries))
+    
+    async def _fetch_one(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+        feed_config: Dict[str, str]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Download a single feed and return its entries, or None on failure"""
+        feed_name = feed_config.get('name', 'Unknown')
+        feed_url = feed_config['url']
+        cached = self._feed_cache.get(feed_url, {})
+        
+        async with semaphore:
+            logger.info(f"Fetching feed: {feed_name}")
+            try:
+                async with session.get(feed_url, headers=_conditional_headers(cached)) as resp:
+                    if resp.status == 304:
+                        logger.info(f"Feed not modified: {feed_name}")
+                        return cached.get('entries', [])
+                    resp.raise_for_status()
+                    body = await resp.read()
+                    etag = resp.headers.get('ETag')
+                    modified = resp.headers.get('Last-Modified')
+            except Exception as e:
+                logger.error(f"Error fetching feed {feed_name}: {e}")
+                return None
+        
+        return self._entries_from_body(feed_config, body, etag, modified)
+    
+    def _fetch_all_threaded(
+        self,
+        feeds: List[Dict[str, str]]
+    ) -> List[Tuple[Dict[str, str], Optional[List[Dict[str, Any]]]]]:
+        """Download and parse all feeds concurrently on a thread pool"""
+        if not feeds:
+            return []
+        
+        entries: Dict[int, Optional[List[Dict[str, Any]]]] = {}
+        max_workers = min(self.max_concurrency, len(feeds))
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._fetch_one_sync, feed_config): i
+                for i, feed_config in enumerate(feeds)
+            }
+            
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    entries[i] = future.result()
+                except Exception as e:
+                    logger.error(f"Error fetching feed {feeds[i].get('name', 'Unknown')}: {e}")
+                    entries[i] = None
+        
+        return [(feed_config, entries[i]) for i, feed_config in enumerate(feeds)]
+    
+    def _fetch_one_sync(self, feed_config: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Download a single feed with a blocking request and return its entries"""
+        feed_name = feed_config.get('name', 'Unknown')
+        feed_url = feed_config['url']
+        cached = self._feed_cache.get(feed_url, {})
+        
+        logger.info(f"Fetching feed: {feed_name}")
+        resp = requests.get(
+            feed_url,
+            headers=_conditional_headers(cached),
+            timeout=self.timeout_seconds
+        )
+        
+        if resp.status_code == 304:
+            logger.info(f"Feed not modified: {feed_name}")
+            return cached.get('entries', [])
+        resp.raise_for_status()
+        
+        return self._entries_from_body(
+            feed_config,
+            resp.content,
+            resp.headers.get('ETag'),
+            resp.headers.get('Last-Modified')
+        )
+    
+    def _entries_from_body(
+        self,
+        feed_config: Dict[str, str],
+        body: bytes,
+        etag: Optional[str],
+        modified: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """Parse a downloaded feed body, reusing cached entries if the bytes are unchanged"""
+        feed_name = feed_config.get('name', 'Unknown')
+        feed_url = feed_config['url']
+        cached = self._feed_cache.get(feed_url, {})
+        
+        # Many servers ignore ETags but return identical bytes; hashing is far
+        # cheaper than parsing them again
+        body_hash = hashlib.blake2b(body, digest_size=16).hexdigest()
+        
+        if cached.get('body_hash') == body_hash and 'entries' in cached:
+            logger.info(f"Feed content unchanged: {feed_name}")
+            entries = cached['entries']
+        else:
+            # Well-formed feeds take the streaming fast path; anything else goes
+            # to feedparser, which accepts raw bytes and skips its own HTTP request
+            entries = _parse_feed_xml(body, self.max_articles_per_feed)
+            if entries is None:
+                entries = self._extract_entries(feedparser.parse(body), feed_name)
+        
+        self._feed_cache[feed_url] = {
+            'etag': etag,
+            'modified': modified,
+            'body_hash': body_hash,
+            'entries': entries
+        }
+        return entries
+    
+    def _extract_entries(self, feed: Any, feed_name: str) -> List[Dict[str, Any]]:
+        """Reduce a parsed feed to the plain entry fields we use and can cache"""
+        if feed.bozo:
+            logger.warning(f"Feed parsing error for {feed_name}: {feed.bozo_exception}")
+        
+        entries = []
+        for entry in feed.entries[:self.max_articles_per_feed]:
+            published_parsed = entry.get('published_parsed')
+            entries.append({
+                'title': entry.get('title', ''),
+                'link': entry.get('link', ''),
+                'summary': entry.get('summary', entry.get('description', '')),
+                'published_parsed': list(published_parsed) if published_parsed else None
+            })
+        
+        return entries
+    
+    def _load_feed_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Load conditional-GET validators and entries from the previous run"""
+        if not self.cache_path:
+            return {}
+        
+        try:
+            return load_json(self.cache_path)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable feed cache {self.cache_path}: {e}")
+            return {}
+    
+    def _save_feed_cache(self):
+        """Persist the feed cache for the next run"""
+        if not self.cache_path:
+            return
+        
+        try:
+            save_json(self._feed_cache, self.cache_path)
+        except Exception as e:
+            logger.warning(f"Failed to save feed cache {self.cache_path}: {e}")
+    
+    def _parse_entry(self, entry: Any, source: str) -> Optional[Article]:
+        """Parse RSS entry into an Article"""
         try:
             title = entry.get('title', '').strip()
             link = entry.get('link', '').strip()
@@ -104,40 +444,52 @@ class ArticleFetcher:
                 return None
             
             # Get summary
-            summary = entry.get('summary', entry.get('description', '')).strip()
-            summary = clean_text(summary)
+            summary = entry.get('summary', entry.get('description', ''))
+            summary = clean_text(summary)[:500]  # Limit summary length
             
-            # Parse published date
-            published_date = None
-            if hasattr(entry, 'published_parsed') and entry.published_parsed:
+            # Parse published date (feed time tuples are UTC)
+            published_ts = None
+            published_parsed = entry.get('published_parsed')
+            if published_parsed:
                 try:
-                    published_date = datetime(*entry.published_parsed[:6])
-                except:
+                    published_ts = calendar.timegm(published_parsed)
+                except (TypeError, ValueError):
                     pass
             
-            # Extract matched keywords
-            text_to_check = f"{title} {summary}".lower()
-            matched_keywords = extract_keywords(text_to_check, self.keywords)
-            
-            return {
-                'title': title,
-                'url': link,
-                'summary': summary[:500],  # Limit summary length
-                'source': source,
-                'published_date': published_date,
-                'matched_keywords': matched_keywords,
-                'relevance_score': len(matched_keywords)
-            }
+            # Keywords are matched later by _score_articles, once the date
+            # filter has dropped entries outside the window
+            return Article(
+                title=title,
+                url=link,
+                summary=summary,
+                source=source,
+                published_ts=published_ts,
+                matched_keywords=[],
+                relevance_score=0
+            )
             
         except Exception as e:
             logger.error(f"Error parsing entry: {e}")
             return None
     
+    def _score_articles(self, articles: List[Article]):
+        """Set matched keywords and relevance score on each article in place"""
+        for article in articles:
+            text_to_check = (article.title + ' ' + article.summary).lower()
+            matched_keywords = self._match_keywords(text_to_check)
+            article.matched_keywords = matched_keywords
+            article.relevance_score = len(matched_keywords)
+    
+    def _match_keywords(self, text_lower: str) -> List[str]:
+        """Return configured keywords found in already-lowercased text"""
+        # Config order is preserved so output stays stable across runs
+        return match_keywords(text_lower, self.keywords, self._matcher)
+    
     def filter_by_keywords(
         self,
-        articles: List[Dict[str, Any]],
+        articles: List[Article],
         min_keywords: int = 1
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Article]:
         """
         Filter articles by keyword matches
         
@@ -148,19 +500,67 @@ class ArticleFetcher:
         Returns:
             Filtered articles
         """
-        filtered = [
-            article for article in articles
-            if article.get('relevance_score', 0) >= min_keywords
-        ]
+        if min_keywords <= 0:
+            # Every article has a non-negative score, so nothing to scan
+            filtered = list(articles)
+        else:
+            filtered = [
+                article for article in articles
+                if article.relevance_score >= min_keywords
+            ]
         
         logger.info(f"Filtered {len(filtered)}/{len(articles)} articles by keywords")
         return filtered
     
+    def deduplicate_articles(
+        self,
+        articles: List[Article]
+    ) -> List[Article]:
+        """
+        Collapse articles that point to the same URL
+        
+        The first occurrence is kept; matched keywords from later copies are
+        merged into it and its relevance score is recomputed.
+        
+        Args:
+            articles: List of articles
+            
+        Returns:
+            Articles with unique URLs, in first-seen order
+        """
+        unique: Dict[str, Article] = {}
+        
+        for article in articles:
+            key = _canonical_url(article.url)
+            kept = unique.get(key)
+            
+            if kept is None:
+                unique[key] = article
+                continue
+            
+            new_keywords = [
+                kw for kw in article.matched_keywords
+                if kw not in kept.matched_keywords
+            ]
+            if new_keywords:
+                # Copy before merging so the caller's articles are left untouched
+                merged = kept.matched_keywords + new_keywords
+                unique[key] = replace(
+                    kept,
+                    matched_keywords=merged,
+                    relevance_score=len(merged)
+                )
+        
+        if len(unique) < len(articles):
+            logger.info(f"Removed {len(articles) - len(unique)} duplicate articles")
+        
+        return list(unique.values())
+    
     def rank_articles(
         self,
-        articles: List[Dict[str, Any]],
+        articles: List[Article],
         top_n: int = 10
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Article]:
         """
         Rank articles by relevance and recency
         
@@ -171,17 +571,16 @@ class ArticleFetcher:
         Returns:
             Top ranked articles
         """
-        # Sort by relevance score (descending) and date (descending)
-        sorted_articles = sorted(
+        articles = self.deduplicate_articles(articles)
+        
+        # Select by relevance score (descending) and date (descending); a
+        # bounded heap avoids sorting the whole list when only top_n are kept
+        top_articles = heapq.nlargest(
+            top_n,
             articles,
-            key=lambda x: (
-                x.get('relevance_score', 0),
-                x.get('published_date') or datetime.min
-            ),
-            reverse=True
+            key=lambda x: (x.relevance_score, x.published_ts or 0)
         )
         
-        top_articles = sorted_articles[:top_n]
         logger.info(f"Selected top {len(top_articles)} articles")
         
         return top_articles
@@ -215,5 +614,7 @@ class ArticleFetcher:
         top = self.rank_articles(filtered, count)
         
         logger.info(f"Retrieved {len(top)} top articles")
-        return top
+        
+        # Callers and the saved JSON work with plain dictionaries
+        return [article.to_dict() for article in top]
 
@@ -1,26 +1,156 @@
 """
 Comment generator for articles using Openrouter
 """
+import asyncio
+import functools
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Union, Tuple, Iterable
 from datetime import datetime
 
 from .openrouter_client import OpenrouterClient
-from .article_fetcher import ArticleFetcher
 from .notion_client import NotionClient
+from .mastodon_client import MastodonClient
 from .utils import truncate_text, clean_text
 
 logger = logging.getLogger(__name__)
 
 
+class _TokenBucket:
+    """Async token bucket that spaces out requests to stay under a per-minute limit"""
+    
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        """
+        Initialize token bucket
+        
+        Args:
+            rate_per_minute: Sustained number of acquisitions allowed per minute
+            burst: Number of acquisitions allowed back to back from a full bucket
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(max(1, burst))
+        self.tokens = self.capacity
+        self.last = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class CommentCache:
+    """
+    SQLite cache of generated comments, keyed by normalized article text
+    
+    Cross-posted articles usually share their title and summary, so a hit
+    skips the LLM request entirely. The model and company context are part of
+    the key, so changing either generates fresh comments.
+    """
+    
+    def __init__(self, path: str = "output/.comment_cache.sqlite", max_age_days: float = 30):
+        """
+        Initialize comment cache
+        
+        Args:
+            path: SQLite database file
+            max_age_days: Ignore cached comments older than this
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_age_seconds = max_age_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Every access holds self._lock, so the connection can be shared
+        # with worker threads
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS comments "
+                "(hash TEXT PRIMARY KEY, comment TEXT NOT NULL, ts INTEGER NOT NULL)"
+            )
+    
+    @staticmethod
+    def key(article: Dict[str, Any], max_length: int, model: str, company_context: str) -> str:
+        """
+        Hash an article's normalized title and summary with everything else that shapes its comment
+        
+        Args:
+            article: Article dictionary
+            max_length: Comment length limit
+            model: Model that generates the comment
+            company_context: Company context sent with the request
+            
+        Returns:
+            Hex digest identifying the comment
+        """
+        text = f"{article.get('title', '')} {article.get('summary', '')[:512]}"
+        normalized = " ".join(text.lower().split())
+        key = hashlib.blake2b(digest_size=16)
+        key.update(f"{model}\n{max_length}\n{normalized}\n".encode())
+        key.update(company_context.encode())
+        return key.hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached comment for key, or None if missing or expired"""
+        min_ts = int(time.time() - self.max_age_seconds)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT comment FROM comments WHERE hash = ? AND ts >= ?", (key, min_ts)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+    
+    def put(self, key: str, comment: str):
+        """Store a generated comment"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO comments (hash, comment, ts) VALUES (?, ?, ?)",
+                (key, comment, int(time.time()))
+            )
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+
 class CommentGenerator:
     """Generate thoughtful comments on articles"""
     
+    # Refinement instructions are sent as the system message so every
+    # refinement shares a byte-identical, cacheable prefix; only the comment
+    # and feedback vary, at the end of the user prompt
+    _REFINE_SYSTEM_TEMPLATE = (
+        "Refine the user's comment based on the feedback while keeping it under "
+        "{max_length} characters. Reply with only the refined comment."
+    )
+    _REFINE_PROMPT_TEMPLATE = "Original comment:\n{comment}\n\nFeedback: {feedback}\n\nRefined comment:"
+    
     def __init__(
         self,
         openrouter_client: OpenrouterClient,
         notion_client: NotionClient,
-        max_length: int = 300
+        max_length: int = 300,
+        max_concurrency: int = 1,
+        rate_limit: Optional[float] = None,
+        comment_cache: Optional[CommentCache] = None
     ):
         """
         Initialize comment generator
@@ -29,16 +159,35 @@ class CommentGenerator:
             openrouter_client: Openrouter client for generation
             notion_client: Notion client for company context
             max_length: Maximum comment length
+            max_concurrency: Maximum number of LLM requests in flight at once
+            rate_limit: Maximum LLM requests per minute (None for no limit)
+            comment_cache: Optional cache of previously generated comments
         """
         self.openrouter_client = openrouter_client
         self.notion_client = notion_client
         self.max_length = max_length
+        self.comment_cache = comment_cache
+        self._refine_system_prompt = self._REFINE_SYSTEM_TEMPLATE.format(max_length=max_length)
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limit = rate_limit
+        # Asyncio primitives belong to one event loop, so _limits() creates
+        # them for whichever loop is running
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._bucket: Optional[_TokenBucket] = None
+        self._limits_loop: Optional[asyncio.AbstractEventLoop] = None
         logger.info("Initialized CommentGenerator")
     
+    async def __aenter__(self) -> "CommentGenerator":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.openrouter_client.__aexit__(exc_type, exc, tb)
+    
     def generate_comments(
         self,
         articles: List[Dict[str, Any]],
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        batch_size: int = 1
     ) -> List[Dict[str, Any]]:
         """
         Generate comments for multiple articles
@@ -46,48 +195,302 @@ class CommentGenerator:
         Args:
             articles: List of articles
             temperature: Sampling temperature
+            batch_size: Number of articles packed into each LLM request
             
         Returns:
-            List of articles with generated comments
+            The input articles, updated in place with generated comments
+        """
+        # The Openrouter client's own loop keeps its connections open for later calls
+        return self.openrouter_client.run(
+            self.agenerate_comments(articles, temperature, batch_size)
+        )
+    
+    def generate_comments_batched(
+        self,
+        articles: List[Dict[str, Any]],
+        k: int = 5,
+        temperature: float = 0.7
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate comments with k articles packed into each LLM request
+        
+        Batches whose response cannot be parsed fall back to one request per article.
+        
+        Args:
+            articles: List of articles
+            k: Number of articles per request
+            temperature: Sampling temperature
+            
+        Returns:
+            The input articles, updated in place with generated comments
+        """
+        return self.generate_comments(articles, temperature=temperature, batch_size=k)
+    
+    async def agenerate_comments(
+        self,
+        articles: List[Dict[str, Any]],
+        temperature: float = 0.7,
+        batch_size: int = 1
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate comments for multiple articles concurrently
+        
+        Requests are bounded by max_concurrency and rate_limit. Use the
+        generator as an async context manager to close its HTTP connections
+        when done.
+        
+        Args:
+            articles: List of articles
+            temperature: Sampling temperature
+            batch_size: Number of articles packed into each LLM request
+            
+        Returns:
+            The input articles, updated in place with generated comments
         """
         logger.info(f"Generating comments for {len(articles)} articles")
         
-        # Get company context
-        company_context = self._get_company_context()
+        # Get company context once for every request (and cache lookup);
+        # Notion is synchronous, so keep it off the event loop
+        company_context = ''
+        if articles:
+            company_context = await asyncio.get_running_loop().run_in_executor(
+                None, self._get_company_context
+            )
+        
+        # Articles seen before (e.g. cross-posted stories) reuse their comment
+        comments: List[Union[str, Exception, None]] = [
+            self._cache_get(article, company_context) for article in articles
+        ]
+        pending = [i for i, comment in enumerate(comments) if comment is None]
+        if self.comment_cache is not None:
+            logger.info(f"Comment cache: {len(articles) - len(pending)} hits, {len(pending)} misses")
+        
+        batch_size = max(1, batch_size)
+        pending_articles = [articles[i] for i in pending]
+        batches = [
+            pending_articles[start:start + batch_size]
+            for start in range(0, len(pending_articles), batch_size)
+        ]
         
-        results = []
+        batch_comments: List[List[Union[str, Exception]]] = [[] for _ in batches]
+        queue: asyncio.Queue = asyncio.Queue()
+        for index, batch in enumerate(batches):
+            queue.put_nowait((index, batch))
+        
+        # A fixed pool of workers keeps at most max_concurrency batches (and
+        # their sockets) alive at once, however many articles there are
+        async def worker():
+            while True:
+                try:
+                    index, batch = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                batch_comments[index] = await self._agenerate_batch(
+                    batch, company_context, temperature
+                )
         
-        for i, article in enumerate(articles):
-            logger.info(f"Generating comment {i+1}/{len(articles)}")
+        await asyncio.gather(
+            *[worker() for _ in range(min(self.max_concurrency, len(batches)))]
+        )
+        
+        for i, comment in zip(pending, (c for batch in batch_comments for c in batch)):
+            comments[i] = comment
+            if isinstance(comment, str):
+                self._cache_put(articles[i], company_context, comment)
+        
+        # Results are written onto the article dicts themselves rather than
+        # copied into new ones, all stamped with the time the batch finished
+        generated = 0
+        generated_at = datetime.now().isoformat()
+        
+        for i, (article, comment) in enumerate(zip(articles, comments), 1):
+            if isinstance(comment, Exception):
+                logger.error(f"Error generating comment {i}: {comment}")
+                article['comment'] = None
+                article['error'] = str(comment)
+                continue
             
+            article['comment'] = comment
+            article['comment_generated_at'] = generated_at
+            article['comment_length'] = len(comment)
+            if comment:
+                generated += 1
+            logger.info(f"Generated comment {i}: {len(comment)} chars")
+        
+        logger.info(f"Successfully generated {generated} comments")
+        return articles
+    
+    def run_pipeline(
+        self,
+        articles: Iterable[Dict[str, Any]],
+        mastodon_client: Optional[MastodonClient] = None,
+        temperature: float = 0.7,
+        post_concurrency: int = 2,
+        visibility: str = "public",
+        max_post_length: int = 500
+    ) -> List[Dict[str, Any]]:
+        """Synchronous wrapper around apipeline"""
+        return self.openrouter_client.run(
+            self.apipeline(
+                articles,
+                mastodon_client=mastodon_client,
+                temperature=temperature,
+                post_concurrency=post_concurrency,
+                visibility=visibility,
+                max_post_length=max_post_length
+            )
+        )
+    
+    async def apipeline(
+        self,
+        articles: Iterable[Dict[str, Any]],
+        mastodon_client: Optional[MastodonClient] = None,
+        temperature: float = 0.7,
+        post_concurrency: int = 2,
+        visibility: str = "public",
+        max_post_length: int = 500
+    ) -> List[Dict[str, Any]]:
+        """
+        Comment on, format and post articles as concurrent pipeline stages
+        
+        Articles flow through bounded queues from max_concurrency comment
+        workers to a formatter to post_concurrency posters, so early comments
+        are posted while later ones are still being generated. Each queue
+        holds at most twice as many items as its consumers handle at once.
+        
+        Args:
+            articles: Articles to comment on
+            mastodon_client: Client to post with, or None to only format posts
+            temperature: Sampling temperature
+            post_concurrency: Maximum number of posts in flight at once
+            visibility: Visibility setting for posts
+            max_post_length: Maximum formatted post length
+            
+        Returns:
+            The articles, updated in place with their comment, formatted post
+            and post URL (or error)
+        """
+        loop = asyncio.get_running_loop()
+        done = object()
+        article_queue: asyncio.Queue = asyncio.Queue(maxsize=2 * self.max_concurrency)
+        comment_queue: asyncio.Queue = asyncio.Queue(maxsize=2)
+        post_queue: asyncio.Queue = asyncio.Queue(maxsize=2 * post_concurrency)
+        processed: List[Dict[str, Any]] = []
+        
+        # Notion is synchronous; keep it off the event loop
+        company_context = await loop.run_in_executor(None, self._get_company_context)
+        
+        async def feed():
+            for article in articles:
+                processed.append(article)
+                await article_queue.put(article)
+            for _ in range(self.max_concurrency):
+                await article_queue.put(done)
+        
+        async def comment_worker():
+            while True:
+                article = await article_queue.get()
+                if article is done:
+                    return
+                try:
+                    comment = await self.agenerate_single_comment(
+                        article, company_context, temperature
+                    )
+                except Exception as e:
+                    logger.error(f"Error generating comment for '{article.get('title')}': {e}")
+                    article['comment'] = None
+                    article['error'] = str(e)
+                    continue
+                
+                article['comment'] = comment
+                article['comment_generated_at'] = datetime.now().isoformat()
+                article['comment_length'] = len(comment)
+                if comment:
+                    await comment_queue.put(article)
+        
+        async def comment_stage():
+            await asyncio.gather(*[comment_worker() for _ in range(self.max_concurrency)])
+            await comment_queue.put(done)
+        
+        async def format_stage():
+            while True:
+                article = await comment_queue.get()
+                if article is done:
+                    break
+                article['mastodon_post'] = self.format_comment_for_mastodon(
+                    article, article['comment'], max_length=max_post_length
+                )
+                await post_queue.put(article)
+            for _ in range(post_concurrency):
+                await post_queue.put(done)
+        
+        async def post_worker():
+            while True:
+                article = await post_queue.get()
+                if article is done:
+                    return
+                if mastodon_client is None:
+                    continue
+                # Mastodon.py is synchronous, so each post runs on a worker thread
+                try:
+                    result = await loop.run_in_executor(None, functools.partial(
+                        mastodon_client.post, article['mastodon_post'], visibility=visibility
+                    ))
+                    article['post_url'] = result['url']
+                except Exception as e:
+                    logger.error(f"Error posting comment for '{article.get('title')}': {e}")
+                    article['post_error'] = str(e)
+        
+        await asyncio.gather(
+            feed(),
+            comment_stage(),
+            format_stage(),
+            *[post_worker() for _ in range(post_concurrency)]
+        )
+        
+        logger.info(
+            f"Pipeline finished: {sum(1 for a in processed if 'mastodon_post' in a)} formatted, "
+            f"{sum(1 for a in processed if 'post_url' in a)} posted"
+        )
+        return processed
+    
+    async def _agenerate_batch(
+        self,
+        articles: List[Dict[str, Any]],
+        company_context: str,
+        temperature: float
+    ) -> List[Union[str, Exception]]:
+        """
+        Generate comments for a batch of articles
+        
+        Several articles are packed into one request; if that response cannot
+        be parsed, the batch falls back to one request per article.
+        
+        Returns:
+            A comment or the raised exception for each article, in input order
+        """
+        if len(articles) > 1:
+            logger.info(f"Generating {len(articles)} comments in one request")
             try:
-                comment = self.generate_single_comment(
-                    article=article,
+                comments = await self._arequest(
+                    self.openrouter_client.agenerate_article_comments_batch,
+                    articles=articles,
                     company_context=company_context,
+                    max_length=self.max_length,
                     temperature=temperature
                 )
-                
-                result = {
-                    **article,
-                    'comment': comment,
-                    'comment_generated_at': datetime.now().isoformat(),
-                    'comment_length': len(comment)
-                }
-                
-                results.append(result)
-                logger.info(f"Generated comment {i+1}: {len(comment)} chars")
-                
+                return [truncate_text(clean_text(c), self.max_length) for c in comments]
             except Exception as e:
-                logger.error(f"Error generating comment {i+1}: {e}")
-                results.append({
-                    **article,
-                    'comment': None,
-                    'error': str(e)
-                })
-                continue
+                logger.warning(f"Batch comment generation failed, generating individually: {e}")
+        
+        comments = []
+        for article in articles:
+            try:
+                comments.append(await self._agenerate_one(article, company_context, temperature))
+            except Exception as e:
+                comments.append(e)
         
-        logger.info(f"Successfully generated {len([r for r in results if r.get('comment')])} comments")
-        return results
+        return comments
     
     def generate_single_comment(
         self,
@@ -109,6 +512,10 @@ class CommentGenerator:
         if company_context is None:
             company_context = self._get_company_context()
         
+        cached = self._cache_get(article, company_context)
+        if cached is not None:
+            return cached
+        
         title = article.get('title', '')
         summary = article.get('summary', '')
         
@@ -124,16 +531,101 @@ class CommentGenerator:
         comment = clean_text(comment)
         comment = truncate_text(comment, self.max_length)
         
+        self._cache_put(article, company_context, comment)
         return comment
     
+    async def agenerate_single_comment(
+        self,
+        article: Dict[str, Any],
+        company_context: Optional[str] = None,
+        temperature: float = 0.7
+    ) -> str:
+        """Async variant of generate_single_comment"""
+        if company_context is None:
+            company_context = await asyncio.get_running_loop().run_in_executor(
+                None, self._get_company_context
+            )
+        
+        cached = self._cache_get(article, company_context)
+        if cached is not None:
+            return cached
+        
+        comment = await self._agenerate_one(article, company_context, temperature)
+        self._cache_put(article, company_context, comment)
+        return comment
+    
+    async def _agenerate_one(
+        self,
+        article: Dict[str, Any],
+        company_context: Optional[str],
+        temperature: float
+    ) -> str:
+        """Request a comment for one article, bypassing the comment cache"""
+        if company_context is None:
+            company_context = await asyncio.get_running_loop().run_in_executor(
+                None, self._get_company_context
+            )
+        
+        comment = await self._arequest(
+            self.openrouter_client.agenerate_article_comment,
+            article_title=article.get('title', ''),
+            article_summary=article.get('summary', ''),
+            company_context=company_context,
+            max_length=self.max_length,
+            temperature=temperature
+        )
+        
+        return truncate_text(clean_text(comment), self.max_length)
+    
+    def _cache_key(self, article: Dict[str, Any], company_context: str) -> str:
+        """Comment cache key for the article under the current model and settings"""
+        return CommentCache.key(
+            article, self.max_length, self.openrouter_client.model, company_context
+        )
+    
+    def _cache_get(self, article: Dict[str, Any], company_context: str) -> Optional[str]:
+        """Look up a previously generated comment for the article"""
+        if self.comment_cache is None:
+            return None
+        return self.comment_cache.get(self._cache_key(article, company_context))
+    
+    def _cache_put(self, article: Dict[str, Any], company_context: str, comment: str):
+        """Remember a generated comment for the article"""
+        if self.comment_cache is not None and comment:
+            self.comment_cache.put(self._cache_key(article, company_context), comment)
+    
+    def _limits(self) -> Tuple[asyncio.Semaphore, Optional[_TokenBucket]]:
+        """Get the concurrency semaphore and rate limiter for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._limits_loop is not loop:
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+            self._bucket = (
+                _TokenBucket(self.rate_limit, burst=self.max_concurrency)
+                if self.rate_limit else None
+            )
+            self._limits_loop = loop
+        return self._sem, self._bucket
+    
+    async def _arequest(self, call, **kwargs):
+        """Await an Openrouter call once a concurrency slot and a rate-limit token are free"""
+        semaphore, bucket = self._limits()
+        async with semaphore:
+            if bucket is not None:
+                await bucket.acquire()
+            return await call(**kwargs)
+    
     def _get_company_context(self) -> str:
-        """Get company context from Notion"""
+        """Get company context from Notion, which caches it for its ttl_seconds"""
         try:
             return self.notion_client.get_company_info_summary()
         except Exception as e:
             logger.warning(f"Failed to fetch company context: {e}")
             return "TrustStack is an AI/ML company focused on innovative solutions."
     
+    def invalidate_context(self):
+        """Force the next comment to refetch company context from Notion"""
+        self.notion_client.clear_cache()
+    
     def format_comment_for_mastodon(
         self,
         article: Dict[str, Any],
@@ -153,22 +645,20 @@ class CommentGenerator:
         Returns:
             Formatted Mastodon post
         """
-        parts = []
+        # Article reference
+        url = article.get('url', '') if include_url else ''
+        suffix = f"\n\n🔗 {url}" if url else ''
         
-        # Add comment
-        parts.append(comment)
+        # Most comments already fit, so only truncate when they don't
+        if len(comment) + len(suffix) <= max_length:
+            return comment + suffix
         
-        # Add article reference
-        if include_url:
-            url = article.get('url', '')
-            if url:
-                parts.append(f"\n\n🔗 {url}")
+        if len(suffix) + 3 >= max_length:
+            # Not even the link fits with room to spare; cut the whole post
+            return truncate_text(comment + suffix, max_length)
         
-        # Join and truncate
-        post = ''.join(parts)
-        post = truncate_text(post, max_length)
-        
-        return post
+        # Shorten the comment rather than cutting off the link
+        return truncate_text(comment, max_length - len(suffix)) + suffix
     
     def batch_format_for_mastodon(
         self,
@@ -227,17 +717,11 @@ class CommentGenerator:
         Returns:
             Refined comment
         """
-        prompt = f"""Original comment:
-{comment}
-
-Feedback: {feedback}
-
-Please refine the comment based on the feedback while keeping it under {self.max_length} characters.
-
-Refined comment:"""
+        prompt = self._REFINE_PROMPT_TEMPLATE.format(comment=comment, feedback=feedback)
         
         refined = self.openrouter_client.generate_completion(
             prompt=prompt,
+            system_prompt=self._refine_system_prompt,
             temperature=temperature,
             max_tokens=200
         )
@@ -2,32 +2,63 @@
 Configuration management for TrustStack Social Media Automation
 """
 import os
-import yaml
+from functools import cached_property, lru_cache
 from pathlib import Path
-from dotenv import load_dotenv
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+
+# yaml and dotenv are imported on first use so that importing this module
+# stays cheap for code paths that never build a Config
+
+# Whether .env has been loaded into the environment yet
+_dotenv_loaded = False
+
+# Parsed YAML per file, reused until the file's modification time changes
+_YAML_CACHE: Dict[Path, Tuple[float, Dict[str, Any]]] = {}
+
+
+@lru_cache(maxsize=256)
+def _split_key(key: str) -> Tuple[str, ...]:
+    """Split a dotted configuration key into its parts"""
+    return tuple(key.split('.'))
 
-# Load environment variables
-load_dotenv()
 
 class Config:
     """Configuration manager for the application"""
     
     def __init__(self, config_path: str = "config.yaml"):
         self.config_path = Path(config_path)
+        self._validation_errors = None
         self._load_config()
         self._load_env_vars()
     
     def _load_config(self):
         """Load configuration from YAML file"""
-        if not self.config_path.exists():
-            raise FileNotFoundError(f"Config file not found: {self.config_path}")
+        try:
+            mtime = self.config_path.stat().st_mtime
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Config file not found: {self.config_path}") from None
+        
+        cache_key = self.config_path.resolve()
+        cached = _YAML_CACHE.get(cache_key)
+        if cached and cached[0] == mtime:
+            self.config = cached[1]
+            return
+        
+        import yaml
         
         with open(self.config_path, 'r') as f:
             self.config = yaml.safe_load(f)
+        _YAML_CACHE[cache_key] = (mtime, self.config)
     
     def _load_env_vars(self):
         """Load environment variables"""
+        global _dotenv_loaded
+        if not _dotenv_loaded:
+            from dotenv import load_dotenv
+            
+            load_dotenv()
+            _dotenv_loaded = True
+        
         # Openrouter
         self.openrouter_api_key = os.getenv('OPENROUTER_API_KEY')
         self.openrouter_model = os.getenv('OPENROUTER_MODEL', 'anthropic/claude-3.5-sonnet')
@@ -42,42 +73,54 @@ class Config:
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value by key"""
-        keys = key.split('.')
         value = self.config
-        for k in keys:
+        for k in _split_key(key):
             if isinstance(value, dict):
                 value = value.get(k)
             else:
                 return default
         return value if value is not None else default
     
-    @property
+    @cached_property
     def rss_feeds(self) -> list:
         """Get list of RSS feeds"""
         return self.get('rss_feeds', [])
     
-    @property
+    @cached_property
     def article_keywords(self) -> list:
         """Get article filtering keywords"""
         return self.get('article_keywords', [])
     
-    @property
+    @cached_property
     def article_settings(self) -> Dict[str, Any]:
         """Get article fetching settings"""
         return self.get('article_settings', {})
     
-    @property
+    @cached_property
     def post_settings(self) -> Dict[str, Any]:
         """Get post generation settings"""
         return self.get('post_settings', {})
     
-    @property
+    @cached_property
     def comment_settings(self) -> Dict[str, Any]:
         """Get comment generation settings"""
         return self.get('comment_settings', {})
     
+    def invalidate(self):
+        """Reload the YAML file if it changed and drop cached settings"""
+        self._load_config()
+        for name in (
+            'rss_feeds', 'article_keywords', 'article_settings',
+            'post_settings', 'comment_settings'
+        ):
+            self.__dict__.pop(name, None)
+    
     def validate(self) -> list:
         """Validate required configuration values"""
+        # Values are read once at init, so the result never changes
+        if self._validation_errors is not None:
+            return list(self._validation_errors)
+        
         errors = []
         
         if not self.openrouter_api_key:
@@ -92,16 +135,12 @@ class Config:
         if not self.mastodon_access_token:
             errors.append("MASTODON_ACCESS_TOKEN not set")
         
-        return errors
-
+        self._validation_errors = errors
+        return list(errors)
 
-# Global config instance
-_config = None
 
+@lru_cache(maxsize=1)
 def get_config(config_path: str = "config.yaml") -> Config:
     """Get or create global config instance"""
-    global _config
-    if _config is None:
-        _config = Config(config_path)
-    return _config
+    return Config(config_path)
 
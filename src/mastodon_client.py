@@ -1,30 +1,53 @@
 """
 Mastodon API client for posting social media content
 """
+import asyncio
+import functools
 import logging
-from typing import Dict, Any, Optional, List
-from mastodon import Mastodon
+import random
+import time
+import uuid
+from typing import Dict, Any, Optional, List, Union, Callable, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Backoff for transient failures: the delay before retry n is drawn
+# uniformly from [0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**n)]
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
 
 class MastodonClient:
     """Client for posting to Mastodon"""
     
-    def __init__(self, access_token: str, api_base_url: str = "https://mastodon.social"):
+    def __init__(
+        self,
+        access_token: str,
+        api_base_url: str = "https://mastodon.social",
+        max_retries: int = 4
+    ):
         """
         Initialize Mastodon client
         
         Args:
             access_token: Mastodon access token
             api_base_url: Mastodon instance URL
+            max_retries: Retries for server errors and network failures
         """
+        # Imported here so modules that never post don't pay for Mastodon.py
+        from mastodon import Mastodon, MastodonNetworkError, MastodonServerError
+        
         self.access_token = access_token
         self.api_base_url = api_base_url
+        self.max_retries = max_retries
+        self._retry_errors = (MastodonNetworkError, MastodonServerError)
         
+        # "wait" sleeps only when the server's rate-limit headers say the
+        # quota is used up, so callers don't need fixed delays between posts
         self.client = Mastodon(
             access_token=access_token,
-            api_base_url=api_base_url
+            api_base_url=api_base_url,
+            ratelimit_method="wait"
         )
         
         logger.info(f"Initialized Mastodon client for {api_base_url}")
@@ -37,6 +60,30 @@ class MastodonClient:
             logger.error(f"Failed to verify Mastodon credentials: {e}")
             raise
     
+    def _call(self, method: Callable, *args, **kwargs):
+        """
+        Call a Mastodon.py method, retrying transient failures
+        
+        Rate limits are already waited out by the Mastodon client; this
+        covers 5xx responses and network errors with capped exponential
+        backoff and full jitter.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                return method(*args, **kwargs)
+            except self._retry_errors as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+                logger.warning(f"Mastodon request failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+    
+    def _status_post(self, **kwargs) -> Dict[str, Any]:
+        """Post a status with retries"""
+        # The same key on every attempt lets the server drop duplicates when
+        # a post went through but the response was lost
+        return self._call(self.client.status_post, idempotency_key=uuid.uuid4().hex, **kwargs)
+    
     def post(
         self,
         content: str,
@@ -59,7 +106,7 @@ class MastodonClient:
         try:
             logger.info(f"Posting to Mastodon ({len(content)} chars)")
             
-            status = self.client.status_post(
+            status = self._status_post(
                 status=content,
                 visibility=visibility,
                 sensitive=sensitive,
@@ -82,11 +129,77 @@ class MastodonClient:
             logger.error(f"Error posting to Mastodon: {e}")
             raise
     
+    async def apost_many(
+        self,
+        contents: List[str],
+        visibility: str = "public",
+        max_concurrency: int = 5
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Post several independent statuses concurrently
+        
+        Mastodon.py is synchronous, so each post runs on a worker thread.
+        Posts may appear on the timeline in any order.
+        
+        Args:
+            contents: Post contents
+            visibility: Visibility setting
+            max_concurrency: Maximum number of posts in flight at once
+            
+        Returns:
+            Posted status information or the raised exception for each post, in input order
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def post_one(content):
+            async with semaphore:
+                return await loop.run_in_executor(
+                    None, functools.partial(self.post, content, visibility=visibility)
+                )
+        
+        return await asyncio.gather(*[post_one(c) for c in contents], return_exceptions=True)
+    
+    async def areply_many(
+        self,
+        replies: List[Tuple[str, str]],
+        visibility: str = "public",
+        max_concurrency: int = 5
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Post several independent replies concurrently
+        
+        Mastodon.py is synchronous, so each reply runs on a worker thread. Its
+        client already waits out the server's rate limit, so no fixed pause is
+        needed between replies.
+        
+        Args:
+            replies: (status ID to reply to, reply content) pairs
+            visibility: Visibility setting
+            max_concurrency: Maximum number of replies in flight at once
+            
+        Returns:
+            Posted reply information or the raised exception for each reply, in input order
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def reply_one(status_id, content):
+            async with semaphore:
+                return await loop.run_in_executor(None, functools.partial(
+                    self.reply_to_status, status_id, content, visibility=visibility
+                ))
+        
+        return await asyncio.gather(
+            *[reply_one(status_id, content) for status_id, content in replies],
+            return_exceptions=True
+        )
+    
     def post_thread(
         self,
         posts: list,
         visibility: str = "public",
-        delay_seconds: int = 2
+        delay_seconds: int = 0
     ) -> list:
         """
         Post a thread of related posts
@@ -94,13 +207,12 @@ class MastodonClient:
         Args:
             posts: List of post contents
             visibility: Visibility setting
-            delay_seconds: Delay between posts
+            delay_seconds: Extra delay between posts (rate limits are already
+                waited out by the Mastodon client)
             
         Returns:
             List of posted status information
         """
-        import time
-        
         results = []
         in_reply_to_id = None
         
@@ -108,7 +220,7 @@ class MastodonClient:
             logger.info(f"Posting thread {i+1}/{len(posts)}")
             
             try:
-                status = self.client.status_post(
+                status = self._status_post(
                     status=content,
                     visibility=visibility,
                     in_reply_to_id=in_reply_to_id
@@ -124,12 +236,13 @@ class MastodonClient:
                 in_reply_to_id = status['id']
                 
                 # Delay before next post
-                if i < len(posts) - 1:
+                if delay_seconds and i < len(posts) - 1:
                     time.sleep(delay_seconds)
                 
             except Exception as e:
+                # Later items still go out, replying to the last post that succeeded
                 logger.error(f"Error posting thread item {i+1}: {e}")
-                break
+                continue
         
         logger.info(f"Posted thread with {len(results)} posts")
         return results
@@ -196,7 +309,8 @@ class MastodonClient:
         self,
         query: str,
         limit: int = 5,
-        account_id: Optional[str] = None
+        account_id: Optional[str] = None,
+        max_pages: int = 3
     ) -> List[Dict[str, Any]]:
         """
         Search for posts on Mastodon using hashtag timeline
@@ -205,6 +319,7 @@ class MastodonClient:
             query: Hashtag to search for (without #)
             limit: Maximum number of results
             account_id: Optional account ID to exclude own posts
+            max_pages: Maximum timeline pages to request while collecting results
             
         Returns:
             List of matching posts
@@ -215,21 +330,38 @@ class MastodonClient:
             
             logger.info(f"Searching Mastodon hashtag: #{hashtag}")
             
+            fetch_page = functools.partial(
+                self._call, self.client.timeline_hashtag, hashtag, limit=min(40, limit * 2)
+            )
+            
             # Try to get hashtag timeline (doesn't require special permissions)
             try:
-                statuses = self.client.timeline_hashtag(
-                    hashtag,
-                    limit=limit * 3  # Get more to filter
-                )
-            except:
+                first_page = fetch_page()
+            except Exception:
                 # Fallback: try public timeline and filter
                 logger.info("Hashtag search failed, trying public timeline")
-                statuses = self.client.timeline_public(limit=40)
+                fetch_page = functools.partial(self._call, self.client.timeline_public, limit=40)
+                first_page = fetch_page()
+            
+            def iter_statuses():
+                # Older pages are requested only if the loop below still needs results
+                statuses = first_page
+                for page in range(1, max_pages + 1):
+                    yield from statuses
+                    if not statuses or page == max_pages:
+                        return
+                    try:
+                        statuses = fetch_page(max_id=statuses[-1]['id'])
+                    except Exception as e:
+                        # Keep the posts already collected from earlier pages
+                        logger.warning(f"Stopped paging Mastodon timeline after page {page}: {e}")
+                        return
             
             posts = []
-            keywords = query.lower().split()
+            keywords = frozenset(query.lower().split())
+            tag_names = keywords | {hashtag.lower()}
             
-            for status in statuses:
+            for status in iter_statuses():
                 # Skip own posts if account_id provided
                 if account_id and status['account']['id'] == account_id:
                     continue
@@ -242,8 +374,9 @@ class MastodonClient:
                 content_lower = status.get('content', '').lower()
                 if not any(keyword in content_lower for keyword in keywords):
                     # Also check hashtags
-                    post_tags = [tag.get('name', '').lower() for tag in status.get('tags', [])]
-                    if not any(keyword in tag for keyword in keywords for tag in post_tags):
+                    if not any(
+                        tag.get('name', '').lower() in tag_names for tag in status.get('tags', [])
+                    ):
                         continue
                 
                 posts.append({
@@ -291,7 +424,7 @@ class MastodonClient:
         try:
             logger.info(f"Replying to status {status_id}")
             
-            status = self.client.status_post(
+            status = self._status_post(
                 status=reply_content,
                 in_reply_to_id=status_id,
                 visibility=visibility
@@ -1,28 +1,46 @@
 """
 Notion API client for fetching company information
 """
+import asyncio
 import logging
-from typing import Dict, Any, Optional
-from notion_client import Client
+import time
+from typing import Dict, Any, Optional, List, Tuple
+from notion_client import AsyncClient, Client
 from notion_client.errors import APIResponseError
 
 logger = logging.getLogger(__name__)
 
+# Blocks whose children are separate pages or databases, not part of this page's text
+SUBPAGE_BLOCK_TYPES = frozenset(('child_page', 'child_database'))
+
+# Largest page of block children the Notion API returns per request
+BLOCK_PAGE_SIZE = 100
+
+# Notion allows about 3 requests per second on average, and the SDK doesn't
+# retry rate-limited requests, so nested block fetches are capped at this many
+MAX_CONCURRENT_REQUESTS = 3
+
 
 class NotionClient:
     """Client for fetching company information from Notion"""
     
-    def __init__(self, api_key: str, page_id: str):
+    def __init__(self, api_key: str, page_id: str, ttl_seconds: float = 900):
         """
         Initialize Notion client
         
         Args:
             api_key: Notion API key
             page_id: Notion page ID containing company information
+            ttl_seconds: Seconds to reuse fetched page content before refetching
         """
+        self.api_key = api_key
         self.client = Client(auth=api_key)
         self.page_id = page_id
+        self.ttl_seconds = ttl_seconds
         self._cached_content = None
+        self._cached_at = 0.0
+        # Formatted summary of _cached_content, built on first request
+        self._cached_summary: Optional[str] = None
     
     def fetch_page_content(self, force_refresh: bool = False) -> Dict[str, Any]:
         """
@@ -34,10 +52,18 @@ class NotionClient:
         Returns:
             Dictionary containing page content
         """
-        if self._cached_content and not force_refresh:
+        if not force_refresh and self._cache_fresh():
             logger.info("Using cached Notion content")
             return self._cached_content
         
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop in this thread, so both requests can run concurrently
+            return asyncio.run(self.afetch_page_content(force_refresh=True))
+        
+        # Called from inside a running event loop, where asyncio.run() isn't
+        # allowed; fall back to sequential requests
         try:
             logger.info(f"Fetching Notion page: {self.page_id}")
             
@@ -45,26 +71,49 @@ class NotionClient:
             page = self.client.pages.retrieve(page_id=self.page_id)
             
             # Fetch blocks (page content)
-            blocks = self.client.blocks.children.list(block_id=self.page_id)
-            
-            # Parse content
-            content = self._parse_blocks(blocks.get('results', []))
+            blocks = self._fetch_blocks(self.page_id)
             
-            # Get page title
-            title = self._extract_page_title(page)
+            return self._store_content(page, blocks)
             
-            result = {
-                'title': title,
-                'content': content,
-                'raw_text': self._blocks_to_text(blocks.get('results', [])),
-                'properties': page.get('properties', {})
-            }
+        except APIResponseError as e:
+            logger.error(f"Notion API error: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Error fetching Notion content: {e}")
+            raise
+    
+    async def afetch_page_content(self, force_refresh: bool = False) -> Dict[str, Any]:
+        """
+        Fetch content from Notion page, requesting the page and its blocks concurrently
+        
+        Args:
+            force_refresh: Force refresh cached content
             
-            self._cached_content = result
-            logger.info(f"Successfully fetched Notion page: {title}")
+        Returns:
+            Dictionary containing page content
+        """
+        if not force_refresh and self._cache_fresh():
+            logger.info("Using cached Notion content")
+            return self._cached_content
+        
+        try:
+            logger.info(f"Fetching Notion page: {self.page_id}")
             
-            return result
+            # A client per fetch, since its connections belong to the running event loop
+            async with AsyncClient(auth=self.api_key) as client:
+                semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+                
+                async def retrieve_page():
+                    async with semaphore:
+                        return await client.pages.retrieve(page_id=self.page_id)
+                
+                page, blocks = await asyncio.gather(
+                    retrieve_page(),
+                    self._afetch_blocks(client, self.page_id, semaphore)
+                )
             
+            return self._store_content(page, blocks)
+        
         except APIResponseError as e:
             logger.error(f"Notion API error: {e}")
             raise
@@ -72,55 +121,169 @@ class NotionClient:
             logger.error(f"Error fetching Notion content: {e}")
             raise
     
+    def _fetch_blocks(self, block_id: str) -> List[Dict]:
+        """Fetch every block under block_id, with nested blocks following their parent"""
+        results = []
+        response = self.client.blocks.children.list(block_id=block_id, page_size=BLOCK_PAGE_SIZE)
+        results.extend(response.get('results', []))
+        while response.get('has_more'):
+            response = self.client.blocks.children.list(
+                block_id=block_id, page_size=BLOCK_PAGE_SIZE, start_cursor=response['next_cursor']
+            )
+            results.extend(response.get('results', []))
+        
+        blocks = []
+        for block in results:
+            blocks.append(block)
+            if self._has_nested_blocks(block):
+                blocks.extend(self._fetch_blocks(block['id']))
+        return blocks
+    
+    async def _afetch_blocks(
+        self,
+        client: AsyncClient,
+        block_id: str,
+        semaphore: asyncio.Semaphore
+    ) -> List[Dict]:
+        """
+        Async variant of _fetch_blocks that fetches nested blocks concurrently
+        
+        Args:
+            client: Notion client bound to the running event loop
+            block_id: Block (or page) whose children to fetch
+            semaphore: Shared by the whole fetch to limit requests in flight
+            
+        Returns:
+            Every block under block_id, with nested blocks following their parent
+        """
+        results = []
+        subtrees: Dict[str, asyncio.Future] = {}
+        
+        try:
+            # Each cursor comes from the previous response, so pages are
+            # sequential, but nested blocks start loading as soon as their
+            # parent is seen
+            async with semaphore:
+                response = await client.blocks.children.list(
+                    block_id=block_id, page_size=BLOCK_PAGE_SIZE
+                )
+            while True:
+                for block in response.get('results', []):
+                    results.append(block)
+                    if self._has_nested_blocks(block):
+                        subtrees[block['id']] = asyncio.ensure_future(
+                            self._afetch_blocks(client, block['id'], semaphore)
+                        )
+                if not response.get('has_more'):
+                    break
+                async with semaphore:
+                    response = await client.blocks.children.list(
+                        block_id=block_id, page_size=BLOCK_PAGE_SIZE, start_cursor=response['next_cursor']
+                    )
+            
+            await asyncio.gather(*subtrees.values())
+        except BaseException:
+            for task in subtrees.values():
+                task.cancel()
+            raise
+        
+        blocks = []
+        for block in results:
+            blocks.append(block)
+            if block.get('id') in subtrees:
+                blocks.extend(subtrees[block['id']].result())
+        return blocks
+    
+    def _has_nested_blocks(self, block: Dict) -> bool:
+        """Whether a block has children that belong to this page's content"""
+        return bool(block.get('has_children')) and block.get('type') not in SUBPAGE_BLOCK_TYPES
+    
+    def _store_content(self, page: Dict, blocks: List[Dict]) -> Dict[str, Any]:
+        """Parse a fetched page and its blocks, and cache the result"""
+        # Parse content
+        content, raw_text = self._parse_blocks(blocks)
+        
+        # Get page title
+        title = self._extract_page_title(page)
+        
+        result = {
+            'title': title,
+            'content': content,
+            'raw_text': raw_text,
+            'properties': page.get('properties', {})
+        }
+        
+        self._cached_content = result
+        self._cached_at = time.monotonic()
+        self._cached_summary = None
+        logger.info(f"Successfully fetched Notion page: {title}")
+        
+        return result
+    
+    def _cache_fresh(self) -> bool:
+        """Whether cached content exists and is younger than ttl_seconds"""
+        return (
+            self._cached_content is not None
+            and time.monotonic() - self._cached_at < self.ttl_seconds
+        )
+    
     def _extract_page_title(self, page: Dict) -> str:
         """Extract title from page properties"""
-        properties = page.get('properties', {})
+        properties = page.get('properties') or {}
         
-        # Try to find title property
-        for prop_name, prop_value in properties.items():
-            if prop_value.get('type') == 'title':
-                title_list = prop_value.get('title', [])
-                if title_list:
-                    return title_list[0].get('plain_text', 'Untitled')
+        # Standalone pages call their title property "title"; database pages
+        # may name it anything, so fall back to the first title-typed property
+        title_prop = properties.get('title')
+        if not title_prop or title_prop.get('type') != 'title':
+            title_prop = next(
+                (prop for prop in properties.values() if prop.get('type') == 'title'), None
+            )
         
-        return 'Untitled'
+        try:
+            return title_prop['title'][0].get('plain_text', 'Untitled')
+        except (TypeError, KeyError, IndexError):
+            return 'Untitled'
     
-    def _parse_blocks(self, blocks: list) -> Dict[str, Any]:
-        """Parse Notion blocks into structured content"""
+    def _parse_blocks(self, blocks: list) -> Tuple[Dict[str, Any], str]:
+        """
+        Parse Notion blocks into structured content and plain text
+        
+        Returns:
+            The structured content, and the text of every block joined by blank lines
+        """
         content = {
             'paragraphs': [],
             'headings': [],
             'lists': [],
             'quotes': []
         }
+        text_parts = []
         
         for block in blocks:
+            # Each block's text is extracted once and feeds both outputs
+            text = self._extract_text_from_block(block)
+            if not text:
+                continue
+            text_parts.append(text)
+            
             block_type = block.get('type')
             
             if block_type == 'paragraph':
-                text = self._extract_text_from_block(block)
-                if text:
-                    content['paragraphs'].append(text)
+                content['paragraphs'].append(text)
             
             elif block_type in ['heading_1', 'heading_2', 'heading_3']:
-                text = self._extract_text_from_block(block)
-                if text:
-                    content['headings'].append({
-                        'level': int(block_type.split('_')[1]),
-                        'text': text
-                    })
+                content['headings'].append({
+                    'level': int(block_type.split('_')[1]),
+                    'text': text
+                })
             
             elif block_type in ['bulleted_list_item', 'numbered_list_item']:
-                text = self._extract_text_from_block(block)
-                if text:
-                    content['lists'].append(text)
+                content['lists'].append(text)
             
             elif block_type == 'quote':
-                text = self._extract_text_from_block(block)
-                if text:
-                    content['quotes'].append(text)
+                content['quotes'].append(text)
         
-        return content
+        return content, '\n\n'.join(text_parts)
     
     def _extract_text_from_block(self, block: Dict) -> str:
         """Extract plain text from a block"""
@@ -130,17 +293,6 @@ class NotionClient:
         
         return ''.join([text.get('plain_text', '') for text in rich_text])
     
-    def _blocks_to_text(self, blocks: list) -> str:
-        """Convert all blocks to plain text"""
-        text_parts = []
-        
-        for block in blocks:
-            text = self._extract_text_from_block(block)
-            if text:
-                text_parts.append(text)
-        
-        return '\n\n'.join(text_parts)
-    
     def get_company_info_summary(self) -> str:
         """
         Get a formatted summary of company information
@@ -148,6 +300,9 @@ class NotionClient:
         Returns:
             Formatted string with company information
         """
+        if self._cached_summary is not None and self._cache_fresh():
+            return self._cached_summary
+        
         content = self.fetch_page_content()
         
         summary_parts = [f"# {content['title']}\n"]
@@ -161,10 +316,12 @@ class NotionClient:
         for paragraph in parsed['paragraphs']:
             summary_parts.append(paragraph)
         
-        return '\n\n'.join(summary_parts)
+        self._cached_summary = '\n\n'.join(summary_parts)
+        return self._cached_summary
     
     def clear_cache(self):
         """Clear cached content"""
         self._cached_content = None
+        self._cached_summary = None
         logger.info("Cleared Notion cache")
 
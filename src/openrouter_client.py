@@ -1,38 +1,242 @@
 """
 Openrouter API client for LLM interactions
 """
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List
-from openai import OpenAI
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple, Union
+import httpx
+from openai import OpenAI, AsyncOpenAI, DefaultAsyncHttpxClient
+
+from .utils import json_loads
 
 logger = logging.getLogger(__name__)
 
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+# Providers that only cache prompt prefixes marked with cache_control;
+# others (e.g. OpenAI) cache identical prefixes automatically
+CACHE_CONTROL_MODEL_PREFIXES = ("anthropic/", "google/gemini")
+
+
+# System prompts depend only on the length limit, so each is built once per
+# limit and the same string is reused by every request
+@lru_cache(maxsize=32)
+def _social_post_system_prompt(max_length: int) -> str:
+    """System prompt shared by social posts of every style"""
+    return f"""You are a social media manager for TrustStack. 
+Create engaging social media posts that highlight the company's value proposition.
+Posts should be concise, engaging, and under {max_length} characters."""
+
+
+@lru_cache(maxsize=32)
+def _comment_system_prompt(max_length: int) -> str:
+    """System prompt shared by single and batched article comments"""
+    return f"""You are an AI/ML expert representing TrustStack. 
+Create thoughtful, insightful comments on industry articles.
+Comments should add value to the discussion and stay under {max_length} characters."""
+
 
 class OpenrouterClient:
     """Client for interacting with Openrouter API"""
     
-    def __init__(self, api_key: str, model: str = "anthropic/claude-3.5-sonnet"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "anthropic/claude-3.5-sonnet",
+        max_retries: int = 5
+    ):
         """
         Initialize Openrouter client
         
         Args:
             api_key: Openrouter API key
             model: Model to use (default: anthropic/claude-3.5-sonnet)
+            max_retries: Retries for rate limits, server errors and network failures
         """
         self.api_key = api_key
         self.model = model
+        # The SDK retries 408/409/429/5xx and connection errors with jittered
+        # exponential backoff, waiting out Retry-After when the server sends it
+        self.max_retries = max_retries
         self.client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=api_key
+            base_url=OPENROUTER_BASE_URL,
+            api_key=api_key,
+            max_retries=max_retries
         )
+        self._async_client: Optional[AsyncOpenAI] = None
+        self._async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Async clients replaced after an event loop change, waiting to be
+        # closed on their own loop
+        self._retired_clients: List[Tuple[asyncio.AbstractEventLoop, AsyncOpenAI]] = []
+        # Sync entry points all run on this one loop, so the async client and
+        # its kept-alive connections survive from one call to the next
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         logger.info(f"Initialized Openrouter client with model: {model}")
     
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """Async client, created on first use so it binds to the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._async_client is not None and self._async_client_loop is not loop:
+            # Pooled connections can't move between event loops
+            logger.debug("Event loop changed, replacing async Openrouter client")
+            self._retire_async_client()
+        if self._async_client is None:
+            # HTTP/2 lets concurrent requests share one pooled TLS connection
+            # instead of opening a connection per in-flight request, and idle
+            # connections are kept alive for reuse by later calls
+            self._async_client = AsyncOpenAI(
+                base_url=OPENROUTER_BASE_URL,
+                api_key=self.api_key,
+                max_retries=self.max_retries,
+                http_client=DefaultAsyncHttpxClient(
+                    http2=True,
+                    timeout=httpx.Timeout(60.0, connect=5.0),
+                    limits=httpx.Limits(
+                        max_connections=100,
+                        max_keepalive_connections=20,
+                        keepalive_expiry=30
+                    )
+                )
+            )
+            self._async_client_loop = loop
+        return self._async_client
+    
+    def run(self, coro):
+        """
+        Run a coroutine to completion from synchronous code
+        
+        Unlike asyncio.run(), every call reuses the same event loop, so the
+        async client's connections stay open between calls.
+        
+        Args:
+            coro: Coroutine to run
+            
+        Returns:
+            The coroutine's result
+        """
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(coro)
+    
+    def _retire_async_client(self):
+        """Detach the async client, keeping it to be closed later on its own loop"""
+        client, loop = self._async_client, self._async_client_loop
+        self._async_client = None
+        self._async_client_loop = None
+        if client is None:
+            return
+        if loop is None or loop.is_closed():
+            # Its connections belong to a loop that can no longer run
+            logger.warning("Abandoned async Openrouter client whose event loop is closed")
+        else:
+            self._retired_clients.append((loop, client))
+    
+    async def aclose(self):
+        """Close the async client and any replaced clients from this event loop"""
+        loop = asyncio.get_running_loop()
+        if self._async_client is not None and self._async_client_loop is not loop:
+            self._retire_async_client()
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+            self._async_client_loop = None
+        
+        retired = [client for client_loop, client in self._retired_clients if client_loop is loop]
+        self._retired_clients = [
+            (client_loop, client) for client_loop, client in self._retired_clients
+            if client_loop is not loop
+        ]
+        for client in retired:
+            await client.close()
+    
+    def close(self):
+        """Close both HTTP clients and the event loop used by run()"""
+        self._retire_async_client()
+        for loop, client in self._retired_clients:
+            # A loop can't be driven from inside another running loop, or
+            # while it is already running elsewhere
+            try:
+                if loop.is_closed() or loop.is_running():
+                    raise RuntimeError("event loop is closed or busy")
+                loop.run_until_complete(client.close())
+            except RuntimeError as e:
+                logger.warning(f"Abandoned async Openrouter client: {e}")
+        self._retired_clients = []
+        
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+            self._loop.close()
+        self._loop = None
+        self.client.close()
+    
+    def __enter__(self) -> "OpenrouterClient":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    async def __aenter__(self) -> "OpenrouterClient":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+    
+    def _build_messages(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        cached_context: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Build the chat messages for a completion request"""
+        messages = []
+        
+        if cached_context:
+            # The context goes at the end of the system message so the whole
+            # prefix is identical across requests and the provider can reuse it
+            context_text = f"Company Context: {cached_context}"
+            if self.model.startswith(CACHE_CONTROL_MODEL_PREFIXES):
+                content: Any = []
+                if system_prompt:
+                    content.append({"type": "text", "text": system_prompt})
+                content.append({
+                    "type": "text",
+                    "text": context_text,
+                    "cache_control": {"type": "ephemeral"}
+                })
+            else:
+                content = f"{system_prompt}\n\n{context_text}" if system_prompt else context_text
+            
+            messages.append({
+                "role": "system",
+                "content": content
+            })
+        elif system_prompt:
+            messages.append({
+                "role": "system",
+                "content": system_prompt
+            })
+        
+        messages.append({
+            "role": "user",
+            "content": prompt
+        })
+        
+        return messages
+    
+    def _format_kwargs(self, response_format: Optional[Dict[str, str]]) -> Dict[str, Any]:
+        """Extra request arguments, leaving response_format out unless it is set"""
+        return {"response_format": response_format} if response_format else {}
+    
     def generate_completion(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
-        max_tokens: int = 1000
+        max_tokens: int = 1000,
+        cached_context: Optional[str] = None,
+        response_format: Optional[Dict[str, str]] = None
     ) -> str:
         """
         Generate completion from Openrouter
@@ -42,39 +246,184 @@ class OpenrouterClient:
             system_prompt: Optional system prompt
             temperature: Sampling temperature
             max_tokens: Maximum tokens to generate
+            cached_context: Optional company context shared by many requests,
+                sent as a cacheable part of the system message
+            response_format: Optional response format, e.g. {"type": "json_object"}
             
         Returns:
             Generated text
         """
         try:
-            messages = []
+            messages = self._build_messages(prompt, system_prompt, cached_context)
             
-            if system_prompt:
-                messages.append({
-                    "role": "system",
-                    "content": system_prompt
-                })
+            logger.info(f"Generating completion with model: {self.model}")
+            logger.debug(f"Prompt length: {len(prompt)} chars")
             
-            messages.append({
-                "role": "user",
-                "content": prompt
-            })
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **self._format_kwargs(response_format)
+            )
+            
+            content = response.choices[0].message.content
+            logger.info(f"Generated completion: {len(content)} chars")
+            
+            return content
+        
+        except Exception as e:
+            logger.error(f"Error generating completion: {e}")
+            raise
+    
+    async def agenerate_completion(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        cached_context: Optional[str] = None,
+        response_format: Optional[Dict[str, str]] = None
+    ) -> str:
+        """
+        Generate completion from Openrouter without blocking the event loop
+        
+        Args:
+            prompt: User prompt
+            system_prompt: Optional system prompt
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            cached_context: Optional company context shared by many requests,
+                sent as a cacheable part of the system message
+            response_format: Optional response format, e.g. {"type": "json_object"}
+            
+        Returns:
+            Generated text
+        """
+        try:
+            messages = self._build_messages(prompt, system_prompt, cached_context)
             
             logger.info(f"Generating completion with model: {self.model}")
             logger.debug(f"Prompt length: {len(prompt)} chars")
             
-            response = self.client.chat.completions.create(
+            response = await self.async_client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 temperature=temperature,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                **self._format_kwargs(response_format)
             )
             
             content = response.choices[0].message.content
             logger.info(f"Generated completion: {len(content)} chars")
             
             return content
+        
+        except Exception as e:
+            logger.error(f"Error generating completion: {e}")
+            raise
+    
+    def generate_completion_streaming(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        stop_at_chars: Optional[int] = None,
+        cached_context: Optional[str] = None
+    ) -> str:
+        """
+        Generate completion from Openrouter, streaming the response
+        
+        For callers that truncate the result anyway: once stop_at_chars
+        characters have arrived the stream is closed, so they don't wait
+        for the rest of max_tokens to be generated.
+        
+        Args:
+            prompt: User prompt
+            system_prompt: Optional system prompt
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            stop_at_chars: Stop reading after this many characters (None reads everything)
+            cached_context: Optional company context shared by many requests,
+                sent as a cacheable part of the system message
+                
+        Returns:
+            Generated text, possibly cut off after stop_at_chars characters
+        """
+        try:
+            messages = self._build_messages(prompt, system_prompt, cached_context)
+            
+            logger.info(f"Streaming completion with model: {self.model}")
+            logger.debug(f"Prompt length: {len(prompt)} chars")
+            
+            parts = []
+            received = 0
+            with self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            ) as stream:
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    text = chunk.choices[0].delta.content or ''
+                    parts.append(text)
+                    received += len(text)
+                    if stop_at_chars is not None and received >= stop_at_chars:
+                        break
+            
+            content = ''.join(parts)
+            logger.info(f"Generated completion: {len(content)} chars")
+            
+            return content
+        
+        except Exception as e:
+            logger.error(f"Error generating completion: {e}")
+            raise
+    
+    async def agenerate_completion_streaming(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        stop_at_chars: Optional[int] = None,
+        cached_context: Optional[str] = None
+    ) -> str:
+        """Async variant of generate_completion_streaming"""
+        try:
+            messages = self._build_messages(prompt, system_prompt, cached_context)
+            
+            logger.info(f"Streaming completion with model: {self.model}")
+            logger.debug(f"Prompt length: {len(prompt)} chars")
+            
+            parts = []
+            received = 0
+            stream = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            async with stream:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    text = chunk.choices[0].delta.content or ''
+                    parts.append(text)
+                    received += len(text)
+                    if stop_at_chars is not None and received >= stop_at_chars:
+                        break
+            
+            content = ''.join(parts)
+            logger.info(f"Generated completion: {len(content)} chars")
             
+            return content
+        
         except Exception as e:
             logger.error(f"Error generating completion: {e}")
             raise
@@ -84,7 +433,8 @@ class OpenrouterClient:
         prompts: List[str],
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
-        max_tokens: int = 1000
+        max_tokens: int = 1000,
+        concurrency: int = 8
     ) -> List[str]:
         """
         Generate multiple completions
@@ -94,30 +444,89 @@ class OpenrouterClient:
             system_prompt: Optional system prompt
             temperature: Sampling temperature
             max_tokens: Maximum tokens per completion
+            concurrency: Maximum number of requests in flight at once
             
         Returns:
             List of generated texts
         """
-        results = []
+        results = self.run(
+            self.agenerate_batch(prompts, system_prompt, temperature, max_tokens, concurrency)
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return results
+    
+    async def agenerate_batch(
+        self,
+        prompts: List[str],
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        concurrency: int = 8,
+        stop_at_chars: Optional[int] = None
+    ) -> List[Union[str, Exception]]:
+        """
+        Generate multiple completions concurrently
         
-        for i, prompt in enumerate(prompts):
-            logger.info(f"Generating completion {i+1}/{len(prompts)}")
-            result = self.generate_completion(
-                prompt=prompt,
-                system_prompt=system_prompt,
-                temperature=temperature,
-                max_tokens=max_tokens
-            )
-            results.append(result)
+        Args:
+            prompts: List of prompts
+            system_prompt: Optional system prompt shared by every prompt
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens per completion
+            concurrency: Maximum number of requests in flight at once
+            stop_at_chars: If set, stream each completion and stop reading
+                after this many characters
+            
+        Returns:
+            The generated text or the raised exception for each prompt, in input order
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
         
-        return results
+        async def generate_one(i, prompt):
+            async with semaphore:
+                logger.info(f"Generating completion {i+1}/{len(prompts)}")
+                if stop_at_chars is not None:
+                    return await self.agenerate_completion_streaming(
+                        prompt=prompt,
+                        system_prompt=system_prompt,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        stop_at_chars=stop_at_chars
+                    )
+                return await self.agenerate_completion(
+                    prompt=prompt,
+                    system_prompt=system_prompt,
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                )
+        
+        return await asyncio.gather(
+            *[generate_one(i, prompt) for i, prompt in enumerate(prompts)],
+            return_exceptions=True
+        )
+    
+    def _social_post_prompt(self, company_info: str, style: str, max_length: int) -> str:
+        """User prompt for one social post"""
+        return f"""Based on the following company information, create a compelling social media post:
+
+{company_info}
+
+Create a {style} post that:
+- Highlights a key aspect of TrustStack
+- Is engaging and shareable
+- Stays under {max_length} characters
+- Includes relevant hashtags if appropriate
+
+Post:"""
     
     def generate_social_post(
         self,
         company_info: str,
         style: str = "professional",
         max_length: int = 500,
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        stop_at_chars: Optional[int] = None
     ) -> str:
         """
         Generate a social media post
@@ -127,32 +536,125 @@ class OpenrouterClient:
             style: Writing style (professional, casual, technical)
             max_length: Maximum post length
             temperature: Sampling temperature
+            stop_at_chars: If set, stream the post and stop reading after
+                this many characters
             
         Returns:
             Generated social media post
         """
-        system_prompt = f"""You are a social media manager for TrustStack. 
-Create engaging, {style} social media posts that highlight the company's value proposition.
-Posts should be concise, engaging, and under {max_length} characters."""
+        return self.generate_completion_streaming(
+            prompt=self._social_post_prompt(company_info, style, max_length),
+            system_prompt=_social_post_system_prompt(max_length),
+            temperature=temperature,
+            max_tokens=300,
+            stop_at_chars=stop_at_chars
+        )
+    
+    async def agenerate_social_posts(
+        self,
+        company_info: str,
+        styles: List[str],
+        max_length: int = 500,
+        temperature: float = 0.7,
+        concurrency: int = 8,
+        stop_at_chars: Optional[int] = None
+    ) -> List[Union[str, Exception]]:
+        """
+        Generate one social media post per style concurrently
         
-        prompt = f"""Based on the following company information, create a compelling social media post:
+        Args:
+            company_info: Company information to base posts on
+            styles: Writing style of each post
+            max_length: Maximum post length
+            temperature: Sampling temperature
+            concurrency: Maximum number of requests in flight at once
+            stop_at_chars: If set, stream each post and stop reading after
+                this many characters
+            
+        Returns:
+            The generated post or the raised exception for each style, in input order
+        """
+        return await self.agenerate_batch(
+            prompts=[self._social_post_prompt(company_info, style, max_length) for style in styles],
+            system_prompt=_social_post_system_prompt(max_length),
+            temperature=temperature,
+            max_tokens=300,
+            concurrency=concurrency,
+            stop_at_chars=stop_at_chars
+        )
+    
+    def _article_comment_prompts(
+        self,
+        article_title: str,
+        article_summary: str,
+        max_length: int
+    ) -> Tuple[str, str]:
+        """Build the (system, user) prompts for a single article comment"""
+        prompt = f"""Article: {article_title}
 
-{company_info}
+Summary: {article_summary}
 
-Create a {style} post that:
-- Highlights a key aspect of TrustStack
-- Is engaging and shareable
+Write a thoughtful comment that:
+- Provides insightful perspective on the article
+- Relates to TrustStack's expertise when relevant
+- Adds value to the discussion
+- Is professional and respectful
 - Stays under {max_length} characters
-- Includes relevant hashtags if appropriate
 
-Post:"""
+Comment:"""
         
-        return self.generate_completion(
-            prompt=prompt,
-            system_prompt=system_prompt,
-            temperature=temperature,
-            max_tokens=300
-        )
+        return _comment_system_prompt(max_length), prompt
+    
+    def _article_comments_batch_prompts(
+        self,
+        articles: List[Dict[str, str]],
+        max_length: int
+    ) -> Tuple[str, str]:
+        """Build the (system, user) prompts for a multi-article comment request"""
+        article_parts = [
+            f"--- Article {i} ---\nArticle: {article.get('title', '')}\n\nSummary: {article.get('summary', '')}"
+            for i, article in enumerate(articles)
+        ]
+        articles_text = '\n\n'.join(article_parts)
+        
+        prompt = f"""{articles_text}
+
+For each article above, write a thoughtful comment that:
+- Provides insightful perspective on the article
+- Relates to TrustStack's expertise when relevant
+- Adds value to the discussion
+- Is professional and respectful
+- Stays under {max_length} characters
+
+Output only a JSON object of the form {{"comments": [...]}} with {len(articles)} strings, one comment per article in the same order:"""
+        
+        return _comment_system_prompt(max_length), prompt
+    
+    def _batch_max_tokens(self, count: int, max_length: int) -> int:
+        """Token budget for `count` comments of up to max_length characters"""
+        # Roughly 3 characters per token, plus JSON quoting and separators
+        return count * (max_length // 3 + 20)
+    
+    def _parse_comments_batch(self, response: str, count: int) -> List[str]:
+        """Parse a multi-article comment response into one comment per article"""
+        try:
+            # The {"comments": [...]} object requested with response_format
+            comments = json_loads(response)['comments']
+        except (ValueError, TypeError, KeyError):
+            # Models that ignore response_format may still answer with a bare
+            # array, possibly wrapped in markdown fences or stray text
+            start = response.find('[')
+            end = response.rfind(']')
+            if start == -1 or end < start:
+                raise ValueError("Batch comment response did not contain a JSON array")
+            
+            comments = json_loads(response[start:end + 1])
+        
+        if (not isinstance(comments, list) or len(comments) != count
+                or not all(isinstance(c, str) for c in comments)):
+            raise ValueError(f"Batch comment response did not contain {count} comments")
+        
+        return comments
     
     def generate_article_comment(
         self,
@@ -175,29 +677,91 @@ Post:"""
         Returns:
             Generated comment
         """
-        system_prompt = f"""You are an AI/ML expert representing TrustStack. 
-Create thoughtful, insightful comments on industry articles.
-Comments should add value to the discussion and stay under {max_length} characters."""
-        
-        prompt = f"""Article: {article_title}
-
-Summary: {article_summary}
-
-Company Context: {company_context}
-
-Write a thoughtful comment that:
-- Provides insightful perspective on the article
-- Relates to TrustStack's expertise when relevant
-- Adds value to the discussion
-- Is professional and respectful
-- Stays under {max_length} characters
-
-Comment:"""
+        system_prompt, prompt = self._article_comment_prompts(
+            article_title, article_summary, max_length
+        )
         
         return self.generate_completion(
             prompt=prompt,
             system_prompt=system_prompt,
             temperature=temperature,
-            max_tokens=200
+            max_tokens=200,
+            cached_context=company_context
         )
-
+    
+    async def agenerate_article_comment(
+        self,
+        article_title: str,
+        article_summary: str,
+        company_context: str,
+        max_length: int = 300,
+        temperature: float = 0.7
+    ) -> str:
+        """Async variant of generate_article_comment"""
+        system_prompt, prompt = self._article_comment_prompts(
+            article_title, article_summary, max_length
+        )
+        
+        return await self.agenerate_completion(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=200,
+            cached_context=company_context
+        )
+    
+    def generate_article_comments_batch(
+        self,
+        articles: List[Dict[str, str]],
+        company_context: str,
+        max_length: int = 300,
+        temperature: float = 0.7
+    ) -> List[str]:
+        """
+        Generate comments for several articles in a single completion
+        
+        Args:
+            articles: Articles with 'title' and 'summary' keys
+            company_context: Company context for perspective
+            max_length: Maximum length of each comment
+            temperature: Sampling temperature
+            
+        Returns:
+            One generated comment per article, in input order
+            
+        Raises:
+            ValueError: If the response is not a JSON array with one comment per article
+        """
+        system_prompt, prompt = self._article_comments_batch_prompts(articles, max_length)
+        
+        response = self.generate_completion(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=self._batch_max_tokens(len(articles), max_length),
+            cached_context=company_context,
+            response_format={"type": "json_object"}
+        )
+        
+        return self._parse_comments_batch(response, len(articles))
+    
+    async def agenerate_article_comments_batch(
+        self,
+        articles: List[Dict[str, str]],
+        company_context: str,
+        max_length: int = 300,
+        temperature: float = 0.7
+    ) -> List[str]:
+        """Async variant of generate_article_comments_batch"""
+        system_prompt, prompt = self._article_comments_batch_prompts(articles, max_length)
+        
+        response = await self.agenerate_completion(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=self._batch_max_tokens(len(articles), max_length),
+            cached_context=company_context,
+            response_format={"type": "json_object"}
+        )
+        
+        return self._parse_comments_batch(response, len(articles))
@@ -2,7 +2,7 @@
 Social media post generator using Openrouter and Notion
 """
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from datetime import datetime
 
 from .notion_client import NotionClient
@@ -11,6 +11,10 @@ from .utils import truncate_text, clean_text
 
 logger = logging.getLogger(__name__)
 
+# Extra characters read past max_length before a streamed post is cut off,
+# so whitespace collapsed by clean_text doesn't leave the post short
+STREAM_SLACK_CHARS = 64
+
 
 class PostGenerator:
     """Generate social media posts based on company information"""
@@ -38,7 +42,8 @@ class PostGenerator:
         self,
         count: int = 5,
         styles: Optional[List[str]] = None,
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        concurrency: int = 8
     ) -> List[Dict[str, Any]]:
         """
         Generate multiple social media posts
@@ -47,6 +52,7 @@ class PostGenerator:
             count: Number of posts to generate
             styles: List of styles to use (cycles through if fewer than count)
             temperature: Sampling temperature
+            concurrency: Maximum number of LLM requests in flight at once
             
         Returns:
             List of generated posts with metadata
@@ -61,19 +67,24 @@ class PostGenerator:
         if styles is None:
             styles = ["professional", "casual", "technical", "inspirational", "educational"]
         
+        post_styles = [styles[i % len(styles)] for i in range(count)]
+        
+        if count > 1:
+            # Posts are independent, so request them all at once instead of in turn
+            contents = self.openrouter_client.run(
+                self._agenerate_contents(company_info, post_styles, temperature, concurrency)
+            )
+        else:
+            contents = [self._generate_content(company_info, style, temperature) for style in post_styles]
+        
+        # Every post in the batch shares one timestamp
+        generated_at = datetime.now().isoformat()
         posts = []
         
-        for i in range(count):
-            style = styles[i % len(styles)]
-            logger.info(f"Generating post {i+1}/{count} with style: {style}")
-            
+        for i, (style, post_content) in enumerate(zip(post_styles, contents)):
             try:
-                post_content = self.openrouter_client.generate_social_post(
-                    company_info=company_info,
-                    style=style,
-                    max_length=self.max_length,
-                    temperature=temperature
-                )
+                if isinstance(post_content, Exception):
+                    raise post_content
                 
                 # Clean and truncate
                 post_content = clean_text(post_content)
@@ -84,7 +95,7 @@ class PostGenerator:
                     'content': post_content,
                     'style': style,
                     'length': len(post_content),
-                    'generated_at': datetime.now().isoformat(),
+                    'generated_at': generated_at,
                     'posted': False
                 }
                 
@@ -98,6 +109,43 @@ class PostGenerator:
         logger.info(f"Successfully generated {len(posts)} posts")
         return posts
     
+    def _generate_content(
+        self,
+        company_info: str,
+        style: str,
+        temperature: float
+    ) -> Union[str, Exception]:
+        """Generate one post's text, returning the raised exception on failure"""
+        logger.info(f"Generating post with style: {style}")
+        try:
+            return self.openrouter_client.generate_social_post(
+                company_info=company_info,
+                style=style,
+                max_length=self.max_length,
+                temperature=temperature,
+                stop_at_chars=self.max_length + STREAM_SLACK_CHARS
+            )
+        except Exception as e:
+            return e
+    
+    async def _agenerate_contents(
+        self,
+        company_info: str,
+        styles: List[str],
+        temperature: float,
+        concurrency: int
+    ) -> List[Union[str, Exception]]:
+        """Generate the text of one post per style concurrently"""
+        logger.info(f"Generating {len(styles)} posts concurrently")
+        return await self.openrouter_client.agenerate_social_posts(
+            company_info=company_info,
+            styles=styles,
+            max_length=self.max_length,
+            temperature=temperature,
+            concurrency=concurrency,
+            stop_at_chars=self.max_length + STREAM_SLACK_CHARS
+        )
+    
     def generate_single_post(
         self,
         style: str = "professional",
@@ -127,7 +175,8 @@ class PostGenerator:
             company_info=company_info,
             style=style,
             max_length=self.max_length,
-            temperature=temperature
+            temperature=temperature,
+            stop_at_chars=self.max_length + STREAM_SLACK_CHARS
         )
         
         # Clean and truncate
@@ -168,10 +217,11 @@ Please refine the post based on the feedback while keeping it under {self.max_le
 
 Refined post:"""
         
-        refined = self.openrouter_client.generate_completion(
+        refined = self.openrouter_client.generate_completion_streaming(
             prompt=prompt,
             temperature=temperature,
-            max_tokens=300
+            max_tokens=300,
+            stop_at_chars=self.max_length + STREAM_SLACK_CHARS
         )
         
         return truncate_text(clean_text(refined), self.max_length)
@@ -1,21 +1,67 @@
 """
 Reply generator for Mastodon posts using structured outputs
 """
+import asyncio
+import hashlib
 import logging
+import threading
+from html.parser import HTMLParser
 from typing import List, Dict, Any
 from datetime import datetime
-from bs4 import BeautifulSoup
 
 from .openrouter_client import OpenrouterClient
 from .notion_client import NotionClient
-from .utils import clean_text, truncate_text
+from .utils import clean_text, json_loads, truncate_text
 
 logger = logging.getLogger(__name__)
 
 
+class _TextExtractor(HTMLParser):
+    """Collect the text of an HTML snippet, without building a tree"""
+    
+    # Mastodon wraps paragraphs in <p> and line breaks in <br>; other tags
+    # (e.g. the <span> inside a hashtag link) must not split words
+    _BREAK_TAGS = frozenset(('p', 'br'))
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+    
+    def reset(self):
+        """Clear parser state and collected text so the instance can be reused"""
+        super().reset()
+        self.parts: List[str] = []
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in self._BREAK_TAGS:
+            self.parts.append(' ')
+    
+    def handle_data(self, data):
+        self.parts.append(data)
+
+
+# Parsers keep state while feeding, so each thread reuses its own instance
+_extractors = threading.local()
+
+
+def _text_extractor() -> _TextExtractor:
+    """Return this thread's reusable text extractor, reset for a new document"""
+    extractor = getattr(_extractors, 'extractor', None)
+    if extractor is None:
+        extractor = _extractors.extractor = _TextExtractor()
+    else:
+        extractor.reset()
+    return extractor
+
+
 class ReplyGenerator:
     """Generate replies to Mastodon posts using structured outputs"""
     
+    _BATCH_PROMPT_INSTRUCTIONS = (
+        "\nGenerate replies for each post. For each post, decide if it's relevant to TrustStack's expertise "
+        "and worth replying to. If yes, create a thoughtful, helpful reply. If no, explain why.\n\n"
+        "Output as a JSON object:"
+    )
+    
     def __init__(
         self,
         openrouter_client: OpenrouterClient,
@@ -38,15 +84,18 @@ class ReplyGenerator:
     def clean_html(self, html_text: str) -> str:
         """Remove HTML tags from text"""
         try:
-            soup = BeautifulSoup(html_text, 'html.parser')
-            return soup.get_text()
-        except:
+            parser = _text_extractor()
+            parser.feed(html_text)
+            parser.close()
+            return clean_text(''.join(parser.parts))
+        except Exception:
             return html_text
     
     def generate_replies_batch(
         self,
         posts: List[Dict[str, Any]],
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        concurrency: int = 1
     ) -> List[Dict[str, Any]]:
         """
         Generate replies for multiple posts using structured outputs
@@ -54,6 +103,7 @@ class ReplyGenerator:
         Args:
             posts: List of posts to reply to
             temperature: Sampling temperature
+            concurrency: Maximum concurrent requests if falling back to per-post generation
             
         Returns:
             List of posts with generated replies
@@ -77,45 +127,40 @@ IMPORTANT GUIDELINES:
 - Only mention TrustStack if naturally relevant
 - Avoid generic responses
 
-Generate replies as a JSON array with this structure:
-[
-  {
-    "post_index": 0,
-    "reply": "Your thoughtful reply here",
-    "should_reply": true/false,
-    "reason": "Why replying or not"
-  }
-]"""
+Generate replies as a JSON object with this structure:
+{
+  "replies": [
+    {
+      "post_index": 0,
+      "reply": "Your thoughtful reply here",
+      "should_reply": true/false,
+      "reason": "Why replying or not"
+    }
+  ]
+}"""
         
         try:
-            # Generate all replies at once
+            # Generate all replies at once; JSON mode keeps models from
+            # wrapping the output in markdown fences or prose
             response = self.openrouter_client.generate_completion(
                 prompt=batch_prompt,
                 system_prompt=system_prompt,
                 temperature=temperature,
-                max_tokens=2000
+                max_tokens=2000,
+                response_format={"type": "json_object"}
             )
             
-            # Parse structured output
-            import json
-            
-            # Extract JSON from response (handle markdown code blocks)
-            response_clean = response.strip()
-            if response_clean.startswith('```'):
-                # Remove markdown code block markers
-                lines = response_clean.split('\n')
-                response_clean = '\n'.join(lines[1:-1])
-            
-            replies_data = json.loads(response_clean)
+            replies_by_index = {
+                r.get('post_index'): r for r in self._parse_replies_batch(response)
+            }
+            # Every reply in the batch shares one timestamp
+            generated_at = datetime.now().isoformat()
             
             # Combine with original posts
             results = []
             for post_idx, post in enumerate(posts):
                 # Find matching reply
-                reply_data = next(
-                    (r for r in replies_data if r.get('post_index') == post_idx),
-                    None
-                )
+                reply_data = replies_by_index.get(post_idx)
                 
                 if reply_data and reply_data.get('should_reply'):
                     reply_text = clean_text(reply_data.get('reply', ''))
@@ -127,7 +172,7 @@ Generate replies as a JSON array with this structure:
                         'should_reply': True,
                         'reason': reply_data.get('reason', ''),
                         'reply_length': len(reply_text),
-                        'generated_at': datetime.now().isoformat()
+                        'generated_at': generated_at
                     })
                 else:
                     results.append({
@@ -135,7 +180,7 @@ Generate replies as a JSON array with this structure:
                         'reply': None,
                         'should_reply': False,
                         'reason': reply_data.get('reason', 'Not relevant') if reply_data else 'Not relevant',
-                        'generated_at': datetime.now().isoformat()
+                        'generated_at': generated_at
                     })
                 
                 logger.info(f"Post {post_idx + 1}: {'Will reply' if reply_data and reply_data.get('should_reply') else 'Skip'}")
@@ -146,49 +191,88 @@ Generate replies as a JSON array with this structure:
         except Exception as e:
             logger.error(f"Error generating batch replies: {e}")
             # Fallback to individual generation
-            return self._generate_replies_individual(posts, company_context, temperature)
+            return self._generate_replies_individual(posts, company_context, temperature, concurrency)
+    
+    def _parse_replies_batch(self, response: str) -> List[Dict[str, Any]]:
+        """Parse a batch reply response into its list of reply objects"""
+        try:
+            # The {"replies": [...]} object requested with response_format
+            replies = json_loads(response)['replies']
+        except (ValueError, TypeError, KeyError):
+            # Models that ignore response_format may still answer with a bare
+            # array, possibly wrapped in markdown fences or stray text
+            start = response.find('[')
+            end = response.rfind(']')
+            if start == -1 or end < start:
+                raise ValueError("Batch reply response did not contain a JSON array")
+            
+            replies = json_loads(response[start:end + 1])
+        
+        if not isinstance(replies, list) or not all(isinstance(r, dict) for r in replies):
+            raise ValueError("Batch reply response was not a list of reply objects")
+        
+        return replies
     
     def _create_batch_prompt(self, posts: List[Dict[str, Any]], company_context: str) -> str:
         """Create a batch prompt for structured output"""
-        prompt_parts = [
-            f"Company Context:\n{company_context}\n",
-            "\nPosts to reply to:\n"
+        cleaned = [
+            (post.get('account', {}).get('username', 'unknown'), self.clean_html(post.get('content', '')))
+            for post in posts
         ]
-        
-        for idx, post in enumerate(posts):
-            content = self.clean_html(post.get('content', ''))
-            author = post.get('account', {}).get('username', 'unknown')
-            
-            prompt_parts.append(
-                f"\n--- Post {idx} ---\n"
-                f"Author: @{author}\n"
-                f"Content: {content}\n"
-            )
-        
-        prompt_parts.append(
-            "\nGenerate replies for each post. For each post, decide if it's relevant to TrustStack's expertise "
-            "and worth replying to. If yes, create a thoughtful, helpful reply. If no, explain why.\n\n"
-            "Output as JSON array:"
+        posts_text = ''.join(
+            f"\n--- Post {idx} ---\nAuthor: @{author}\nContent: {content}\n"
+            for idx, (author, content) in enumerate(cleaned)
         )
         
-        return ''.join(prompt_parts)
+        return (
+            f"Company Context:\n{company_context}\n\nPosts to reply to:\n"
+            f"{posts_text}{self._BATCH_PROMPT_INSTRUCTIONS}"
+        )
     
     def _generate_replies_individual(
         self,
         posts: List[Dict[str, Any]],
         company_context: str,
-        temperature: float
+        temperature: float,
+        concurrency: int = 1
     ) -> List[Dict[str, Any]]:
         """Fallback: Generate replies individually"""
         logger.info("Using individual reply generation (fallback)")
         
-        results = []
+        return self.openrouter_client.run(
+            self._agenerate_replies_individual(posts, company_context, temperature, concurrency)
+        )
+    
+    async def _agenerate_replies_individual(
+        self,
+        posts: List[Dict[str, Any]],
+        company_context: str,
+        temperature: float,
+        concurrency: int
+    ) -> List[Dict[str, Any]]:
+        """Generate one reply per post, at most `concurrency` requests at a time"""
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        # Templated reposts often share their text, so each distinct content
+        # is requested once and its reply reused for every copy
+        requests: Dict[str, asyncio.Future] = {}
+        
+        async def request_reply(prompt):
+            async with semaphore:
+                return await self.openrouter_client.agenerate_completion(
+                    prompt=prompt,
+                    temperature=temperature,
+                    max_tokens=300
+                )
         
-        for idx, post in enumerate(posts):
+        async def reply_one(idx, post):
             try:
                 content = self.clean_html(post.get('content', ''))
-                
-                prompt = f"""Company Context: {company_context}
+                key = hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+                if key in requests:
+                    logger.info(f"Post {idx} duplicates an earlier post, reusing its reply")
+                    response = await requests[key]
+                else:
+                    prompt = f"""Company Context: {company_context}
 
 Post to reply to:
 Author: @{post.get('account', {}).get('username', 'unknown')}
@@ -198,35 +282,32 @@ Should we reply to this post? If yes, generate a helpful, engaging reply (under
 If no, explain why not.
 
 Reply:"""
-                
-                response = self.openrouter_client.generate_completion(
-                    prompt=prompt,
-                    temperature=temperature,
-                    max_tokens=300
-                )
+                    
+                    requests[key] = asyncio.ensure_future(request_reply(prompt))
+                    response = await requests[key]
                 
                 reply_text = clean_text(response)
                 reply_text = truncate_text(reply_text, self.max_length)
                 
-                results.append({
+                return {
                     **post,
                     'reply': reply_text,
                     'should_reply': True,
                     'reason': 'Relevant to expertise',
                     'reply_length': len(reply_text),
                     'generated_at': datetime.now().isoformat()
-                })
+                }
                 
             except Exception as e:
                 logger.error(f"Error generating reply for post {idx}: {e}")
-                results.append({
+                return {
                     **post,
                     'reply': None,
                     'should_reply': False,
                     'reason': f'Error: {str(e)}'
-                })
+                }
         
-        return results
+        return await asyncio.gather(*[reply_one(idx, post) for idx, post in enumerate(posts)])
     
     def _get_company_context(self) -> str:
         """Get company context from Notion"""